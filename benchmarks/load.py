@@ -0,0 +1,179 @@
+"""Load generator for views.home against a stand-in upstream.
+
+    python -m benchmarks.load --users 20 --duration 30 --latency 0.2 --error-rate 0.01
+    python -m benchmarks.load --users 50 --url http://127.0.0.1:8000/ --upstream http://127.0.0.1:8765
+
+Without --url, views.home is called in-process (scratch database and search
+cache, as in benchmarks.run). With --url, requests go over HTTP to a running
+server, which must itself have been started with SWIGGY_UPSTREAM pointing at
+the upstream. Without --upstream, a benchmarks.upstream server is started
+here using the size/latency/error options below.
+
+Reports throughput, latency percentiles, partial pages and how many calls
+each upstream endpoint received.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import requests
+
+from benchmarks.upstream import Server, add_arguments, from_arguments
+
+QUERIES = ["biryani", "pizza", "burger", "paneer tikka", "momos", "dosa"]
+PERCENTILES = [50, 90, 95, 99]
+# Shown by home.html when the search budget ran out.
+PARTIAL_MARKER = b"still loading"
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * p // 100)] if ordered else 0.0
+
+
+def in_process_client(upstream_url):
+    from benchmarks.run import setup_django
+
+    setup_django()
+    from django.test import RequestFactory
+    from swiggy_app import views
+    from swiggy_app.scraper import location_resolver
+    from swiggy_app.transport import Transport, set_transport
+
+    set_transport(Transport(upstream=upstream_url))
+    location_resolver.clear()
+    factory = RequestFactory()
+
+    def get(query):
+        response = views.home(factory.get("/", {"q": query}))
+        return response.status_code, response.content
+
+    return get
+
+
+def http_client(url):
+    local = threading.local()
+
+    def get(query):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        response = local.session.get(url, params={"q": query}, timeout=120)
+        return response.status_code, response.content
+
+    return get
+
+
+def upstream_stats(upstream_url):
+    return requests.get(f"{upstream_url}/_stats", timeout=10).json()
+
+
+def run(get, users, duration, queries, think=0.0, seed=None):
+    deadline = time.monotonic() + duration
+    latencies, statuses = [], Counter()
+    partial = 0
+    lock = threading.Lock()
+
+    def user(index):
+        nonlocal partial
+        rng = random.Random(None if seed is None else seed + index)
+        while time.monotonic() < deadline:
+            query = rng.choice(queries)
+            start = time.monotonic()
+            try:
+                status, body = get(query)
+            except Exception as e:
+                status, body = type(e).__name__, b""
+            elapsed = time.monotonic() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+                partial += PARTIAL_MARKER in body
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    return {
+        "users": users,
+        "duration": wall,
+        "requests": len(latencies),
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "partial": partial,
+        "latency": {
+            **{f"p{p}": percentile(latencies, p) for p in PERCENTILES},
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max": max(latencies, default=0.0),
+        },
+    }
+
+
+def upstream_delta(before, after):
+    counts = Counter(after["requests"])
+    counts.subtract(before["requests"])
+    return {
+        "requests": {key: count for key, count in sorted(counts.items()) if count},
+        "peak_in_flight": after["peak_in_flight"],
+    }
+
+
+def report(result):
+    print(f"{result['users']} users, {result['duration']:.1f}s: {result['requests']} requests, "
+          f"{result['throughput']:.2f} req/s")
+    latency = result["latency"]
+    print("latency  " + "  ".join(f"{name} {value * 1000:.0f}ms" for name, value in latency.items()))
+    print("statuses " + ", ".join(f"{status}: {count}" for status, count in result["statuses"].items())
+          + f"  (partial pages: {result['partial']})")
+    upstream = result["upstream"]
+    calls = sum(upstream["requests"].values())
+    print(f"upstream {calls} calls, {calls / max(result['requests'], 1):.1f} per page, "
+          f"peak {upstream['peak_in_flight']} in flight")
+    for key, count in upstream["requests"].items():
+        print(f"  {key:20} {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--queries", default=",".join(QUERIES))
+    parser.add_argument("--url", help="views.home over HTTP instead of in-process")
+    parser.add_argument("--upstream", help="use an already running benchmarks.upstream")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    upstream_url = args.upstream
+    if upstream_url is None:
+        server = Server(from_arguments(args)).__enter__()
+        upstream_url = server.url
+    try:
+        get = http_client(args.url) if args.url else in_process_client(upstream_url)
+        before = upstream_stats(upstream_url)
+        result = run(get, args.users, args.duration, args.queries.split(","), args.think, args.seed)
+        result["upstream"] = upstream_delta(before, upstream_stats(upstream_url))
+    finally:
+        if server is not None:
+            server.__exit__(None, None, None)
+
+    report(result)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
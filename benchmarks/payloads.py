@@ -0,0 +1,170 @@
+import json
+import random
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+LOCATION = (17.3840, 78.4564)
+
+BASES = [
+    "Biryani", "Pizza", "Burger", "Paneer Tikka", "Butter Chicken", "Dosa", "Idli",
+    "Noodles", "Fried Rice", "Shawarma", "Momos", "Pasta", "Sandwich", "Thali",
+    "Kebab", "Dal Makhani", "Gulab Jamun", "Falooda", "Wrap", "Salad",
+]
+STYLES = [
+    "Hyderabadi", "Chicken", "Veg", "Mutton", "Egg", "Schezwan", "Cheese", "Tandoori",
+    "Masala", "Peri Peri", "Double", "Spicy", "Classic", "Malai", "Afghani",
+]
+CUISINES = ["North Indian", "South Indian", "Chinese", "Biryani", "Pizzas", "Fast Food", "Desserts"]
+VEG_CLASSES = ["VEG", "NONVEG", "EGG"]
+CATEGORY_SIZE = 10
+
+
+def dish_name(rng):
+    return f"{rng.choice(STYLES)} {rng.choice(BASES)}"
+
+
+def restaurant_card(restaurant_id, rng):
+    return {
+        "id": str(restaurant_id),
+        "name": f"{rng.choice(STYLES)} {rng.choice(BASES)} House {restaurant_id}",
+        "city": "Hyderabad",
+        "address": f"{rng.randint(1, 999)}, Road No. {rng.randint(1, 90)}",
+        "avgRating": round(rng.uniform(3.0, 4.9), 1),
+        "totalRatingsString": rng.choice(["50+", "500+", "1K+", "5K+", "10K+"]),
+        "cloudinaryImageId": f"img{rng.getrandbits(48):x}",
+        "costForTwoMessage": f"₹{rng.randint(2, 12) * 100} FOR TWO",
+        "cuisines": rng.sample(CUISINES, 2),
+    }
+
+
+# Same nesting as /dapi/restaurants/search/v3, where SwiggyScrape.parseRestaurants
+# finds each restaurant under groupedCard.cardGroupMap.RESTAURANT.
+def search_payload(restaurants, seed=0):
+    rng = random.Random(seed)
+    cards = [{"card": {"card": {"info": restaurant_card(i, rng)}}} for i in range(restaurants)]
+    return {
+        "statusCode": 0,
+        "data": {
+            "cards": [
+                {"card": {"card": {"@type": "type.googleapis.com/swiggy.gandalf.widgets.v2.Navigation"}}},
+                {"groupedCard": {"cardGroupMap": {"RESTAURANT": {"cards": cards}}}},
+            ]
+        },
+    }
+
+
+def dish_info(restaurant_id, index, rng):
+    price = rng.randint(80, 900) * 100
+    info = {
+        "id": f"{restaurant_id}-{index}",
+        "name": dish_name(rng),
+        "category": rng.choice(BASES),
+        "description": "Serves 1 | " + " ".join(rng.choice(STYLES).lower() for _ in range(8)),
+        "imageId": f"dish{rng.getrandbits(48):x}",
+        "inStock": 1,
+        "isVeg": 1,
+        "price": price,
+        "variants": {},
+        "variantsV2": {},
+        "itemAttribute": {"vegClassifier": rng.choice(VEG_CLASSES)},
+        "ribbon": {},
+        "showImage": True,
+        "itemBadge": {},
+        "badgesV2": {},
+        "ratings": {
+            "aggregatedRating": {
+                "rating": f"{rng.uniform(3.0, 4.9):.1f}",
+                "ratingCount": f"{rng.randint(1, 400)} ratings",
+                "ratingCountV2": str(rng.randint(1, 400)),
+            }
+        },
+    }
+    if rng.random() < 0.3:
+        info["finalPrice"] = price * 8 // 10
+    return {"card": {"@type": "type.googleapis.com/swiggy.presentation.food.v2.Dish", "info": info}}
+
+
+# Same nesting as /dapi/menu/pl: restaurant info in cards[2] and dishes in
+# categories under groupedCard.cardGroupMap.REGULAR.
+def menu_payload(restaurant_id, dishes, seed=None):
+    rng = random.Random(restaurant_id if seed is None else seed)
+    info = restaurant_card(restaurant_id, rng)
+    info.update({
+        "latLong": f"{LOCATION[0] + rng.uniform(-0.05, 0.05):.6f},{LOCATION[1] + rng.uniform(-0.05, 0.05):.6f}",
+        "labels": [
+            {"title": "Timing", "message": "11:00 AM - 11:00 PM"},
+            {"title": "Address", "message": info["address"]},
+        ],
+        "totalRatingsString": f"{rng.randint(1, 20)}K+ ratings",
+        "sla": {
+            "deliveryTime": rng.randint(20, 60),
+            "minDeliveryTime": rng.randint(15, 30),
+            "maxDeliveryTime": rng.randint(35, 70),
+            "lastMileTravel": round(rng.uniform(0.5, 8), 1),
+        },
+        "availability": {"opened": rng.random() < 0.8},
+    })
+    items = [dish_info(restaurant_id, i, rng) for i in range(dishes)]
+    categories = [
+        {"card": {"card": {
+            "@type": "type.googleapis.com/swiggy.presentation.food.v2.ItemCategory",
+            "title": rng.choice(BASES),
+            "itemCards": items[start:start + CATEGORY_SIZE],
+        }}}
+        for start in range(0, dishes, CATEGORY_SIZE)
+    ]
+    return {
+        "statusCode": 0,
+        "data": {
+            "cards": [
+                {"card": {"card": {"@type": "type.googleapis.com/swiggy.presentation.cards.v1.TextBoxV2", "text": info["name"]}}},
+                {"card": {"card": {"@type": "type.googleapis.com/swiggy.gandalf.widgets.v2.GridWidget", "tabs": []}}},
+                {"card": {"card": {"@type": "type.googleapis.com/swiggy.presentation.food.v2.Restaurant", "info": info}}},
+                {"groupedCard": {"cardGroupMap": {"REGULAR": {"cards": categories}}}},
+            ]
+        },
+    }
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+# Answers the three upstream endpoints the scrapers call, in-process. Bodies
+# are encoded once per restaurant id, so repeated runs only pay for the
+# scraper side.
+class StubTransport:
+    def __init__(self, restaurants, dishes, location=LOCATION):
+        self.restaurants = restaurants
+        self.dishes = dishes
+        self.location = location
+        self.search_body = encode(search_payload(restaurants))
+        self.menu_bodies = {}
+
+    def body(self, url, params):
+        path = urlsplit(url).path
+        if path == "/loc":
+            return f"{self.location[0]},{self.location[1]}".encode()
+        if path == "/dapi/restaurants/search/v3":
+            return self.search_body
+        if path == "/dapi/menu/pl":
+            restaurant_id = int(params["restaurantId"])
+            if restaurant_id not in self.menu_bodies:
+                self.menu_bodies[restaurant_id] = encode(menu_payload(restaurant_id, self.dishes))
+            return self.menu_bodies[restaurant_id]
+        return None
+
+    def get(self, url, params=None, **kwargs):
+        body = self.body(url, params or {})
+        response = requests.Response()
+        response.status_code = 200 if body is not None else 404
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = body or b""
+        response.url = url
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,270 @@
+"""Benchmarks for the scraping, parsing and rendering hot paths.
+
+    python -m benchmarks.run                         # full grid, saved under benchmarks/results/
+    python -m benchmarks.run --only parse,menu --restaurants 10,100
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+
+Every case runs on synthetic payloads (benchmarks.payloads) sized by the
+--restaurants and --dishes grids. Cases that take both sizes skip
+combinations above --max-items dishes in total. With --compare, cases whose
+median got slower than --threshold times the earlier run are reported and
+the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.payloads import LOCATION, StubTransport, menu_payload, search_payload
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+RESTAURANTS = [10, 100, 1000, 10000]
+DISHES = [10, 100, 1000]
+MAX_ITEMS = 200_000
+REPEAT = 5
+MIN_TIME = 0.2
+THRESHOLD = 1.25
+
+CASES = {}
+
+
+# A case is a setup function taking the grid sizes it declares and returning
+# (fn, reset): fn is what gets timed, reset (or None) runs untimed before
+# every call.
+def case(name, sizes):
+    def register(setup):
+        CASES[name] = (sizes, setup)
+        return setup
+    return register
+
+
+def processed_menus(restaurants, dishes):
+    from swiggy.scrape import Restaurant
+
+    parser = Restaurant("0", transport=StubTransport(0, 0), lat=LOCATION[0], lng=LOCATION[1])
+    return [parser.restaurants(menu_payload(i, dishes)) for i in range(restaurants)]
+
+
+@case("parse", ("restaurants",))
+def parse_restaurants(restaurants):
+    from swiggy.cache import SearchCache
+    from swiggy.scrape import SwiggyScrape
+
+    scraper = SwiggyScrape(transport=StubTransport(0, 0), lat=LOCATION[0], lng=LOCATION[1], search_cache=SearchCache())
+    payload = search_payload(restaurants)
+    return lambda: scraper.parseRestaurants(payload), None
+
+
+@case("decode", ("dishes",))
+def decode(dishes):
+    from benchmarks.payloads import encode
+    from swiggy.decode import decode_menu
+
+    raw = encode(menu_payload(0, dishes))
+    return lambda: decode_menu(raw), None
+
+
+@case("menu", ("dishes",))
+def restaurant_menu(dishes):
+    from swiggy.scrape import Restaurant
+
+    restaurant = Restaurant("0", transport=StubTransport(0, 0), lat=LOCATION[0], lng=LOCATION[1])
+    payload = menu_payload(0, dishes)
+    return lambda: restaurant.restaurants(payload), None
+
+
+@case("process", ("restaurants", "dishes"))
+def process_data(restaurants, dishes):
+    from swiggy.ui import SwiggyUI
+
+    menus = processed_menus(restaurants, dishes)
+    ui = SwiggyUI(menus)
+    return lambda: ui._process_data(menus), None
+
+
+@case("filter", ("restaurants", "dishes"))
+def dish_filter(restaurants, dishes):
+    from swiggy.ui import SwiggyUI
+
+    ui = SwiggyUI(processed_menus(restaurants, dishes))
+
+    def search():
+        for mode in ("substring", "prefix", "fuzzy"):
+            ui.dishes.matching_restaurants("chicken biryani", index=ui.index, mode=mode)
+        ui.dishes.matching_restaurants("paneer", max_price=300)
+
+    return search, None
+
+
+@case("home", ("restaurants", "dishes"))
+def home(restaurants, dishes):
+    setup_django()
+    from django.conf import settings
+    from django.test import RequestFactory
+    from swiggy_app import views
+    from swiggy_app.models import RestaurantSnapshot
+    from swiggy_app.scraper import location_resolver
+    from swiggy_app.snapshots import snapshot_writer
+    from swiggy_app.transport import set_transport
+
+    # Wait for every menu so runs are comparable.
+    settings.SWIGGY_SEARCH_BUDGET = None
+    set_transport(StubTransport(restaurants, dishes))
+    location_resolver.clear()
+    request = RequestFactory().get("/", {"q": "biryani"})
+
+    # Cold every time: no search cache entry, no menu snapshots.
+    def reset():
+        snapshot_writer.flush()
+        views.search_cache.clear()
+        RestaurantSnapshot.objects.all().delete()
+
+    return lambda: views.home(request), reset
+
+
+_django = None
+
+
+def setup_django():
+    global _django
+    if _django is None:
+        sys.path.insert(0, str(ROOT / "myproject"))
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
+        import django
+        from django.conf import settings
+        from django.core.management import call_command
+
+        scratch = tempfile.mkdtemp(prefix="swiggy-bench-")
+        django.setup()
+        settings.DATABASES["default"]["NAME"] = os.path.join(scratch, "db.sqlite3")
+        settings.SWIGGY_SEARCH_CACHE = os.path.join(scratch, "search_cache.sqlite3")
+        call_command("migrate", verbosity=0)
+        _django = django
+    return _django
+
+
+def measure(fn, reset=None, repeat=REPEAT, min_time=MIN_TIME):
+    if reset:
+        reset()
+    fn()  # warm-up: imports, caches, stub bodies
+    timings = []
+    while len(timings) < repeat or sum(timings) < min_time:
+        if reset:
+            reset()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "runs": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+
+
+def grid(sizes, restaurants, dishes, max_items):
+    if sizes == ("restaurants",):
+        return [{"restaurants": r} for r in restaurants]
+    if sizes == ("dishes",):
+        return [{"dishes": d} for d in dishes]
+    return [
+        {"restaurants": r, "dishes": d}
+        for r in restaurants
+        for d in dishes
+        if r * d <= max_items
+    ]
+
+
+def label(name, params):
+    return name + "[" + ",".join(f"{key[0]}={value}" for key, value in params.items()) + "]"
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:45} {previous['median'] * 1000:10.2f} -> {result['median'] * 1000:10.2f} ms  x{ratio:.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def sizes_arg(value):
+    return [int(size) for size in value.split(",") if size]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma-separated cases ({', '.join(CASES)})")
+    parser.add_argument("--restaurants", type=sizes_arg, default=RESTAURANTS)
+    parser.add_argument("--dishes", type=sizes_arg, default=DISHES)
+    parser.add_argument("--max-items", type=int, default=MAX_ITEMS)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", type=Path, help="where to save results (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # Streamlit complains about running without `streamlit run`.
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in names:
+        sizes, setup = CASES[name]
+        for params in grid(sizes, args.restaurants, args.dishes, args.max_items):
+            fn, reset = setup(**params)
+            result = measure(fn, reset, repeat=args.repeat)
+            results[label(name, params)] = {"case": name, **params, **result}
+            print(f"{label(name, params):45} {result['median'] * 1000:10.2f} ms  (min {result['min'] * 1000:.2f}, {result['runs']} runs)")
+
+    now = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"{now:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "meta": {
+            "created": now.isoformat(),
+            "revision": revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }, indent=2))
+    print(f"saved {output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than x{args.threshold}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
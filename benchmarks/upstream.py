@@ -0,0 +1,207 @@
+"""Local stand-in for the upstreams the scrapers call.
+
+    python -m benchmarks.upstream --port 8765 --restaurants 40 --dishes 100 \\
+        --latency 0.15 --jitter 0.5 --error-rate 0.01 --throttle-rate 0.01
+
+Point the scrapers at it with SWIGGY_UPSTREAM=http://127.0.0.1:8765. It serves
+/dapi/restaurants/search/v3, /dapi/menu/pl and ipinfo's /loc from
+benchmarks.payloads, after a log-normal delay with median --latency seconds
+and shape --jitter. --error-rate of requests get a 500 and --throttle-rate a
+429 with Retry-After. GET /_stats returns request counts per endpoint and
+status as JSON.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.payloads import LOCATION, encode, menu_payload, search_payload
+
+ENDPOINTS = {
+    "/loc": "location",
+    "/dapi/restaurants/search/v3": "search",
+    "/dapi/menu/pl": "menu",
+}
+
+
+class Upstream:
+    def __init__(self, restaurants=40, dishes=100, latency=0.1, jitter=0.5, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, seed=None):
+        self.restaurants = restaurants
+        self.dishes = dishes
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.search_body = encode(search_payload(restaurants))
+        self.menu_bodies = {}
+        self.counts = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    def delay(self):
+        if self.latency <= 0:
+            return 0.0
+        with self.lock:
+            return self.latency * math.exp(self.random.gauss(0, self.jitter))
+
+    def outcome(self):
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return 200
+
+    def body(self, endpoint, query):
+        if endpoint == "location":
+            return f"{LOCATION[0]},{LOCATION[1]}".encode()
+        if endpoint == "search":
+            return self.search_body
+        try:
+            restaurant_id = int(query.get("restaurantId", [""])[0])
+        except ValueError:
+            return None
+        if not 0 <= restaurant_id < self.restaurants:
+            return None
+        body = self.menu_bodies.get(restaurant_id)
+        if body is None:
+            body = self.menu_bodies[restaurant_id] = encode(menu_payload(restaurant_id, self.dishes))
+        return body
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": {f"{endpoint} {status}": count for (endpoint, status), count in sorted(self.counts.items())},
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+    def record(self, endpoint, status):
+        with self.lock:
+            self.counts[endpoint, status] += 1
+
+    def handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path == "/_stats":
+                    return self.send(200, json.dumps(upstream.stats()).encode())
+                endpoint = ENDPOINTS.get(parts.path)
+                if endpoint is None:
+                    return self.send(404, b"")
+
+                with upstream.lock:
+                    upstream.in_flight += 1
+                    upstream.peak_in_flight = max(upstream.peak_in_flight, upstream.in_flight)
+                try:
+                    time.sleep(upstream.delay())
+                    status = upstream.outcome()
+                    body = upstream.body(endpoint, parse_qs(parts.query)) if status == 200 else b""
+                    if body is None:
+                        status, body = 404, b""
+                finally:
+                    with upstream.lock:
+                        upstream.in_flight -= 1
+                upstream.record(endpoint, status)
+                headers = {"Retry-After": str(upstream.retry_after)} if status == 429 else {}
+                self.send(status, body, headers)
+
+            def send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def serve(self, host="127.0.0.1", port=0):
+        server = ThreadingHTTPServer((host, port), self.handler())
+        server.daemon_threads = True
+        return server
+
+
+# Runs an Upstream on a background thread; used as a context manager by
+# benchmarks.load.
+class Server:
+    def __init__(self, upstream, host="127.0.0.1", port=0):
+        self.upstream = upstream
+        self.server = upstream.serve(host, port)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def add_arguments(parser):
+    parser.add_argument("--restaurants", type=int, default=40, help="restaurants per search result")
+    parser.add_argument("--dishes", type=int, default=100, help="dishes per menu")
+    parser.add_argument("--latency", type=float, default=0.1, help="median response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="log-normal shape of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+
+
+def from_arguments(args):
+    return Upstream(
+        restaurants=args.restaurants,
+        dishes=args.dishes,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = from_arguments(args).serve(args.host, args.port)
+    print(f"serving on http://{args.host}:{args.port}  (SWIGGY_UPSTREAM=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,94 @@
+import os
 import threading
-import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from swiggy.cache import SearchCache, normalize_query
+from swiggy.metrics import PAGE_SECONDS, RENDER_SECONDS, cache_lookup, serve
+from swiggy.records import Menu
 from swiggy.scrape import SwiggyScrape, Restaurant
+from swiggy.fanout import fan_out, MAX_WORKERS, SEARCH_BUDGET
 from swiggy.ui import SwiggyUI
 import streamlit as st
 
+# Processed result sets kept per browser session.
+SESSION_SEARCHES = 5
 
+# Set by fetch_menu's body, which only runs on a st.cache_data miss.
+_menu_fetch = threading.local()
+
+
+# Menus are cached as compact records and expanded back to dicts per use.
 @st.cache_data(ttl=3600)
-def fetch_restaurant_data(restaurant_id):
+def fetch_menu(restaurant_id, lat, lng):
+    _menu_fetch.missed = True
     try:
-        restaurant = Restaurant(restaurant_id)
-        return restaurant.get()
+        restaurant = Restaurant(restaurant_id, lat=lat, lng=lng)
+        return Menu.from_dict(restaurant.get())
     except Exception as e:
         st.error(f"Error fetching data for restaurant {restaurant_id}: {str(e)}")
         return None
 
 
-def main():
+def fetch_restaurant_data(restaurant_id, lat, lng):
+    _menu_fetch.missed = False
+    menu = fetch_menu(restaurant_id, lat, lng)
+    cache_lookup("menu", not _menu_fetch.missed)
+    return menu.to_dict() if menu else None
+
+
+@st.cache_resource
+def search_cache():
+    return SearchCache(os.environ.get("SWIGGY_SEARCH_CACHE", ".search_cache.sqlite3"))
+
+
+# SWIGGY_METRICS_PORT=<port> serves /metrics next to the app, once per process,
+# on localhost unless SWIGGY_METRICS_HOST says otherwise (e.g. 0.0.0.0).
+@st.cache_resource
+def metrics_server(port, host):
+    return serve(port, host)
+
+
+# One pool for every session and rerun: menus still running when a search
+# runs out of budget finish here instead of piling up threads per rerun.
+@st.cache_resource
+def menu_executor(max_workers):
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="menu")
+
+
+def search(query, max_workers=MAX_WORKERS, budget=SEARCH_BUDGET):
+    with st.spinner(f"Searching for {query}..."):
+        swiggy = SwiggyScrape(search_cache=search_cache())
+        try:
+            restaurants = swiggy.getResturants(query)
+        except Exception as e:
+            st.error(f"Failed to fetch restaurants: {str(e)}")
+            st.stop()
+
+        if not restaurants:
+            return None
+        menus = fan_out(
+            lambda rest: fetch_restaurant_data(rest["id"], swiggy.lan, swiggy.lng),
+            restaurants,
+            menu_executor(max_workers),
+            budget=budget,
+        )
+        streamed = SwiggyUI()
+        results = streamed.stream_results(menus, len(restaurants))
+
+    if not results:
+        st.error("No restaurant data could be loaded. Please try a different search.")
+        return None
+    default_location = [25.3176, 82.9739]
+    ui = SwiggyUI(results, default_location)
+    ui.complete = streamed.complete
+    return ui
+
+
+def main(max_workers=MAX_WORKERS, budget=SEARCH_BUDGET):
 
-    ui = SwiggyUI()
     st.set_page_config(layout="wide", page_title="🍽️ Food Finder")
+    if os.environ.get("SWIGGY_METRICS_PORT"):
+        metrics_server(int(os.environ["SWIGGY_METRICS_PORT"]), os.environ.get("SWIGGY_METRICS_HOST", "127.0.0.1"))
 
     st.title("Swiggy Analyser")
     query = st.text_input(
@@ -28,44 +98,28 @@ def main():
     )
 
     if query:
-        with st.spinner(f"Searching for {query}..."):
-            swiggy = SwiggyScrape()
-            try:
-                restaurants = swiggy.getResturants(query)
-            except Exception as e:
-                st.error(f"Failed to fetch restaurants: {str(e)}")
-                st.stop()
-
-            if restaurants:
-                result_queue = queue.Queue()
-                threads = []
-
-                for rest in restaurants:
-                    t = threading.Thread(
-                        target=lambda q, rid: q.put(fetch_restaurant_data(rid)),
-                        args=(result_queue, rest["id"]),
-                    )
-                    t.start()
-                    threads.append(t)
-
-                for t in threads:
-                    t.join()
-
-                results = []
-                while not result_queue.empty():
-                    res = result_queue.get()
-                    if res:
-                        results.append(res)
-
-                if results:
-
-                    default_location = [25.3176, 82.9739]
-                    ui = SwiggyUI(results, default_location)
-                    ui.render_results()
-                else:
-                    st.error(
-                        "No restaurant data could be loaded. Please try a different search."
-                    )
+        # Filter, sort and paging widgets rerun this script; the processed
+        # result set for recent queries lives in session state so those
+        # reruns never touch the network. A result set cut short by the
+        # search budget is not kept: the next rerun searches again and picks
+        # up the menus that have reached fetch_menu's cache since.
+        with PAGE_SECONDS.time(view="streamlit"):
+            searches = st.session_state.setdefault("searches", OrderedDict())
+            key = normalize_query(query)
+            ui = searches.get(key)
+            cache_lookup("session", ui is not None)
+            if ui is None:
+                ui = search(query, max_workers, budget)
+                if ui is None:
+                    return
+                if ui.complete:
+                    searches[key] = ui
+                    while len(searches) > SESSION_SEARCHES:
+                        searches.popitem(last=False)
+            else:
+                searches.move_to_end(key)
+            with RENDER_SECONDS.time(view="streamlit"):
+                ui.render_results()
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
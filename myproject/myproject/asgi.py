@@ -3,6 +3,11 @@ ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Async views such as swiggy_app.views.home_async only avoid tying up a worker
+thread per search when served from here, e.g.:
+
+    uvicorn myproject.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'swiggy_app',
 ]
 
 MIDDLEWARE = [
@@ -77,6 +78,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Menu snapshots are written by swiggy_app.snapshots in the
+        # background; IMMEDIATE transactions queue on the write lock instead
+        # of failing, and WAL keeps snapshot reads from waiting on writes.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL;',
+        },
     }
 }
 
@@ -121,3 +130,18 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Scraper
+# Menus scraped within this many seconds are served from RestaurantSnapshot.
+# Parsed search results are shared between workers through a SQLite file.
+# Serialized /api/search pages are kept in the default cache.
+# home returns whatever menus arrived within SWIGGY_SEARCH_BUDGET seconds of
+# the request starting (the restaurant search included); the rest finish in
+# the background and land in RestaurantSnapshot.
+
+SWIGGY_MENU_TTL = 60 * 60
+SWIGGY_SEARCH_CACHE = BASE_DIR / 'search_cache.sqlite3'
+SWIGGY_SEARCH_TTL = 15 * 60
+SWIGGY_API_CACHE_TTL = 5 * 60
+SWIGGY_SEARCH_BUDGET = 3
@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import RestaurantSnapshot, Dish
+
+
+class DishInline(admin.TabularInline):
+    model = Dish
+    extra = 0
+
+
+@admin.register(RestaurantSnapshot)
+class RestaurantSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("restaurant_id", "name", "city", "avg_rating", "fetched_at")
+    search_fields = ("restaurant_id", "name")
+    inlines = [DishInline]
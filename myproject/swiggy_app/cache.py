@@ -0,0 +1,141 @@
+# swiggy_app/cache.py
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+SEARCH_TTL = 15 * 60
+SEARCH_CACHE_SIZE = 256
+# Two decimals is roughly a 1 km cell, close enough to share search results.
+LOCATION_PRECISION = 2
+
+
+def normalize_query(query):
+    words = []
+    for word in re.sub(r"[^\w\s]", " ", query.lower()).split():
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes", "zes")):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def location_cell(lat, lng, precision=LOCATION_PRECISION):
+    return f"{float(lat):.{precision}f},{float(lng):.{precision}f}"
+
+
+# LRU + TTL cache for parsed search results. With a path the entries are also
+# written to a SQLite file, so separate worker processes share them.
+class SearchCache:
+    def __init__(self, path=None, ttl=SEARCH_TTL, maxsize=SEARCH_CACHE_SIZE, precision=LOCATION_PRECISION):
+        self.path = str(path) if path else None
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.precision = precision
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def key(self, query, lat, lng):
+        return f"{normalize_query(query)}@{location_cell(lat, lng, self.precision)}"
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if self.path is None:
+            return None
+        try:
+            with self._connect() as db:
+                row = db.execute(
+                    "SELECT expires, value FROM search_cache WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        value = json.loads(row[1])
+        self._remember(key, row[0], value)
+        return value
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl
+        self._remember(key, expires, value)
+        if self.path is None:
+            return
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, expires, value) VALUES (?, ?, ?)",
+                    (key, expires, json.dumps(value)),
+                )
+                db.execute("DELETE FROM search_cache WHERE expires <= ?", (time.time(),))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path is None:
+            return
+        try:
+            with self._connect() as db:
+                db.execute("DELETE FROM search_cache")
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key, expires, value):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            if not self._ready:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                self._ready = True
+            with db:
+                yield db
+        finally:
+            db.close()
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchCache(os.environ.get("SWIGGY_SEARCH_CACHE"))
+    return _search_cache
+
+
+def set_search_cache(cache):
+    global _search_cache
+    with _search_cache_lock:
+        previous, _search_cache = _search_cache, cache
+    return previous
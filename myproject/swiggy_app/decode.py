@@ -0,0 +1,107 @@
+# swiggy_app/decode.py
+
+import json
+import os
+from typing import Any, List, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# "selective" decodes only the parts of a menu that Restaurant reads (needs
+# msgspec), "fast" decodes whole payloads with orjson, "stdlib" uses json.
+DECODER = os.environ.get("SWIGGY_DECODER", "selective")
+
+
+def loads(raw):
+    if orjson is not None and DECODER != "stdlib":
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+if msgspec is not None:
+    from msgspec import UNSET, UnsetType
+
+    # Only the fields read by Restaurant.restaurant_info and getDishes are
+    # declared; msgspec skips everything else without building Python objects.
+    # UNSET fields are dropped again by to_builtins, so missing keys stay missing.
+    class _Struct(msgspec.Struct, omit_defaults=True):
+        pass
+
+    class _AggregatedRating(_Struct):
+        rating: Any = UNSET
+        ratingCountV2: Any = UNSET
+
+    class _Ratings(_Struct):
+        aggregatedRating: Union[_AggregatedRating, UnsetType] = UNSET
+
+    class _ItemAttribute(_Struct):
+        vegClassifier: Any = UNSET
+
+    class _DishInfo(_Struct):
+        id: Any = UNSET
+        name: Any = UNSET
+        description: Any = UNSET
+        price: Any = UNSET
+        finalPrice: Any = UNSET
+        itemAttribute: Union[_ItemAttribute, UnsetType] = UNSET
+        ratings: Union[_Ratings, UnsetType] = UNSET
+
+    class _ItemInfo(_Struct):
+        info: Union[_DishInfo, UnsetType] = UNSET
+
+    class _ItemCard(_Struct):
+        card: Union[_ItemInfo, UnsetType] = UNSET
+
+    class _CategoryCard(_Struct):
+        itemCards: Union[List[_ItemCard], UnsetType] = UNSET
+
+    class _Category(_Struct):
+        card: Union[_CategoryCard, UnsetType] = UNSET
+
+    class _CategoryWrapper(_Struct):
+        card: Union[_Category, UnsetType] = UNSET
+
+    class _Group(_Struct):
+        cards: Union[List[_CategoryWrapper], UnsetType] = UNSET
+
+    class _CardGroupMap(_Struct):
+        REGULAR: Union[_Group, UnsetType] = UNSET
+
+    class _GroupedCard(_Struct):
+        cardGroupMap: Union[_CardGroupMap, UnsetType] = UNSET
+
+    class _InfoCard(_Struct):
+        info: Any = UNSET
+
+    class _InfoWrapper(_Struct):
+        card: Union[_InfoCard, UnsetType] = UNSET
+
+    class _Card(_Struct):
+        card: Union[_InfoWrapper, UnsetType] = UNSET
+        groupedCard: Union[_GroupedCard, UnsetType] = UNSET
+
+    class _Data(_Struct):
+        cards: Union[List[_Card], UnsetType] = UNSET
+
+    class _Menu(_Struct):
+        data: Union[_Data, UnsetType] = UNSET
+
+    _menu_decoder = msgspec.json.Decoder(_Menu)
+
+
+def decode_menu(raw):
+    if DECODER == "selective" and msgspec is not None:
+        try:
+            return msgspec.to_builtins(_menu_decoder.decode(raw))
+        except msgspec.DecodeError:
+            # Malformed or differently shaped payload: let the full decoder
+            # parse it (or raise) exactly as before.
+            pass
+    return loads(raw)
@@ -0,0 +1,196 @@
+# swiggy_app/limiter.py
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Steady request rate and burst allowed per limited host.
+RATE = 50.0
+BURST = 32
+
+# Concurrency starts low and grows by one slot per window of clean
+# responses; throttling or server errors halve it.
+INITIAL_CONCURRENCY = 4
+MIN_CONCURRENCY = 1
+DECREASE_FACTOR = 0.5
+DECREASE_INTERVAL = 1.0
+
+RETRIES = 3
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 8.0
+# A Retry-After longer than this is not waited out; the response is returned.
+MAX_RETRY_AFTER = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpen(requests.ConnectionError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # Retry-After applies to the host, not just the request that got it.
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AIMDLimit:
+    def __init__(self, initial=INITIAL_CONCURRENCY, minimum=MIN_CONCURRENCY, maximum=BURST):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.decreased = 0.0
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.in_flight -= 1
+                self.cond.notify()
+
+    def increase(self):
+        with self.cond:
+            previous = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) > previous:
+                self.cond.notify()
+
+    def decrease(self):
+        # A burst of concurrent failures is one congestion signal, not many.
+        with self.cond:
+            now = time.monotonic()
+            if now - self.decreased >= DECREASE_INTERVAL:
+                self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+                self.decreased = now
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def check(self, host=None):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpen(f"circuit open for {host or 'upstream'}")
+            # Half-open: let a single request probe the upstream.
+            self.probing = True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+def retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Everything sent to one upstream host passes through here: a token bucket
+# caps the rate, an AIMD limit finds the concurrency the host sustains, and
+# throttled or failed requests are retried with jittered backoff until the
+# circuit breaker decides the host is down.
+class HostLimiter:
+    def __init__(self, host, rate=RATE, burst=BURST, max_concurrency=BURST, retries=RETRIES):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AIMDLimit(maximum=max_concurrency)
+        self.breaker = CircuitBreaker()
+        self.retries = retries
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def call(self, send):
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            self.breaker.check(self.host)
+            self.bucket.acquire()
+            with self.concurrency.slot():
+                try:
+                    response = send()
+                except requests.RequestException:
+                    self.failure()
+                    if last:
+                        raise
+                    delay = self.backoff(attempt)
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        self.concurrency.increase()
+                        self.breaker.success()
+                        return response
+                    self.failure()
+                    wait = retry_after(response)
+                    if wait is not None and wait <= MAX_RETRY_AFTER:
+                        self.bucket.pause(wait)
+                    if last or (wait is not None and wait > MAX_RETRY_AFTER):
+                        return response
+                    delay = max(wait or 0.0, self.backoff(attempt))
+                    response.close()
+            time.sleep(delay)
+
+    def failure(self):
+        # 429s, 5xx and timeouts all mean the host wants less from us.
+        self.breaker.failure()
+        self.concurrency.decrease()
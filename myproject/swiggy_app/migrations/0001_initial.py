@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestaurantSnapshot',
+            fields=[
+                ('restaurant_id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('city', models.CharField(blank=True, max_length=128)),
+                ('address', models.TextField(blank=True)),
+                ('latitude', models.FloatField(null=True)),
+                ('longitude', models.FloatField(null=True)),
+                ('avg_rating', models.FloatField(default=0)),
+                ('total_ratings', models.FloatField(default=0)),
+                ('bayesian_score', models.FloatField(default=0)),
+                ('cuisines', models.JSONField(default=list)),
+                ('delivery_time', models.IntegerField(null=True)),
+                ('min_delivery_time', models.IntegerField(null=True)),
+                ('max_delivery_time', models.IntegerField(null=True)),
+                ('opened', models.BooleanField(default=False)),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Dish',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dish_id', models.CharField(max_length=32)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('price', models.FloatField(default=0)),
+                ('final_price', models.FloatField(default=0)),
+                ('veg_classifier', models.CharField(blank=True, max_length=16)),
+                ('rating', models.FloatField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dishes', to='swiggy_app.restaurantsnapshot')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('restaurant', 'dish_id'), name='unique_dish_per_restaurant')],
+            },
+        ),
+    ]
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+def _number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+# Last successfully scraped menu of a restaurant, used as a read-through cache
+# in front of the /dapi/menu/pl endpoint.
+class RestaurantSnapshot(models.Model):
+    restaurant_id = models.CharField(max_length=32, primary_key=True)
+    name = models.CharField(max_length=255, blank=True)
+    city = models.CharField(max_length=128, blank=True)
+    address = models.TextField(blank=True)
+    latitude = models.FloatField(null=True)
+    longitude = models.FloatField(null=True)
+    avg_rating = models.FloatField(default=0)
+    total_ratings = models.FloatField(default=0)
+    bayesian_score = models.FloatField(default=0)
+    cuisines = models.JSONField(default=list)
+    delivery_time = models.IntegerField(null=True)
+    min_delivery_time = models.IntegerField(null=True)
+    max_delivery_time = models.IntegerField(null=True)
+    opened = models.BooleanField(default=False)
+    fetched_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.restaurant_id})"
+
+    @classmethod
+    def fresh(cls, restaurant_id, ttl):
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        return (
+            cls.objects.filter(restaurant_id=str(restaurant_id), fetched_at__gte=cutoff)
+            .prefetch_related("dishes")
+            .first()
+        )
+
+    # Fresh snapshots among restaurant_ids in one query, keyed by restaurant id.
+    @classmethod
+    def fresh_many(cls, restaurant_ids, ttl):
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        snapshots = (
+            cls.objects.filter(restaurant_id__in=[str(i) for i in restaurant_ids], fetched_at__gte=cutoff)
+            .prefetch_related("dishes")
+        )
+        return {snapshot.restaurant_id: snapshot for snapshot in snapshots}
+
+    @classmethod
+    @transaction.atomic
+    def store(cls, data):
+        info = data["info"]
+        delivery = info.get("delivery", {})
+        lat_long = list(info.get("latLong") or [None, None]) + [None, None]
+        snapshot, _ = cls.objects.update_or_create(
+            restaurant_id=str(info["id"]),
+            defaults={
+                "name": info.get("name") or "",
+                "city": info.get("city") or "",
+                "address": info.get("address") or "",
+                "latitude": lat_long[0],
+                "longitude": lat_long[1],
+                "avg_rating": _number(info.get("avgRating", 0)),
+                "total_ratings": _number(info.get("totalRatings", 0)),
+                "bayesian_score": _number(info.get("bayesianScore", 0)),
+                "cuisines": info.get("cuisines", []),
+                "delivery_time": delivery.get("deliveryTime"),
+                "min_delivery_time": delivery.get("minDeliveryTime"),
+                "max_delivery_time": delivery.get("maxDeliveryTime"),
+                "opened": bool(delivery.get("opened", False)),
+                "fetched_at": timezone.now(),
+            },
+        )
+        snapshot.dishes.all().delete()
+        Dish.objects.bulk_create(
+            Dish(
+                restaurant=snapshot,
+                dish_id=str(dish_id),
+                position=position,
+                name=dish.get("name") or "",
+                description=dish.get("description") or "",
+                price=_number(dish.get("price", 0)),
+                final_price=_number(dish.get("finalPrice", 0)),
+                veg_classifier=dish.get("vegClassifier") or "",
+                rating=_number(dish.get("rating", 0)),
+                rating_count=_number(dish.get("ratingCount", 0), int),
+            )
+            for position, (dish_id, dish) in enumerate(data.get("dishes", {}).items())
+        )
+        return snapshot
+
+    # Same shape as Restaurant.get() so callers cannot tell a cache hit apart.
+    def to_data(self):
+        return {
+            "info": {
+                "id": self.restaurant_id,
+                "name": self.name,
+                "city": self.city,
+                "latLong": [self.latitude, self.longitude],
+                "address": self.address,
+                "bayesianScore": self.bayesian_score,
+                "avgRating": self.avg_rating,
+                "totalRatings": self.total_ratings,
+                "cuisines": self.cuisines,
+                "delivery": {
+                    "deliveryTime": self.delivery_time,
+                    "minDeliveryTime": self.min_delivery_time,
+                    "maxDeliveryTime": self.max_delivery_time,
+                    "opened": self.opened,
+                },
+            },
+            "dishes": {dish.dish_id: dish.to_data() for dish in self.dishes.all()},
+        }
+
+
+class Dish(models.Model):
+    restaurant = models.ForeignKey(RestaurantSnapshot, related_name="dishes", on_delete=models.CASCADE)
+    dish_id = models.CharField(max_length=32)
+    position = models.PositiveIntegerField(default=0)
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    price = models.FloatField(default=0)
+    final_price = models.FloatField(default=0)
+    veg_classifier = models.CharField(max_length=16, blank=True)
+    rating = models.FloatField(default=0)
+    rating_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["restaurant", "dish_id"], name="unique_dish_per_restaurant"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def to_data(self):
+        return {
+            "name": self.name,
+            "description": self.description,
+            "price": self.price,
+            "finalPrice": self.final_price,
+            "vegClassifier": self.veg_classifier,
+            "rating": self.rating,
+            "ratingCount": self.rating_count,
+        }
@@ -0,0 +1,114 @@
+# swiggy_app/replay.py
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Only headers the scrapers (and HostLimiter) look at are kept.
+RECORDED_HEADERS = ("Content-Type", "Retry-After")
+
+
+def request_key(url, params=None):
+    # The full URL with its query string; headers (cookies, referer) are not
+    # part of the key.
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+# Upstream responses stored in one SQLite file, keyed by request_key, with
+# zlib-compressed bodies and the latency they were recorded at.
+class Archive:
+    def __init__(self, path):
+        self.path = str(path)
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def put(self, key, response, elapsed):
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body, elapsed) VALUES (?, ?, ?, ?, ?)",
+                (key, response.status_code, json.dumps(headers), zlib.compress(response.content), elapsed),
+            )
+
+    def get(self, key):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT status, headers, body, elapsed FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, elapsed = row
+        return status, json.loads(headers), zlib.decompress(body), elapsed
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            if not self._ready:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, elapsed REAL NOT NULL)"
+                )
+                self._ready = True
+            with db:
+                yield db
+        finally:
+            db.close()
+
+
+# Wraps a live transport and writes every response it returns to the archive.
+class RecordingTransport:
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.archive = Archive(path)
+
+    def get(self, url, params=None, **kwargs):
+        start = time.monotonic()
+        response = self.transport.get(url, params=params, **kwargs)
+        self.archive.put(request_key(url, params), response, time.monotonic() - start)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+# Serves recorded responses without touching the network. latency is either
+# a fixed number of seconds or "recorded" to sleep for as long as the
+# original request took; requests that were never recorded fail like an
+# unreachable host.
+class ReplayTransport:
+    def __init__(self, path, latency=0.0):
+        self.archive = Archive(path)
+        self.latency = latency
+
+    def get(self, url, params=None, **kwargs):
+        key = request_key(url, params)
+        entry = self.archive.get(key)
+        if entry is None:
+            raise requests.ConnectionError(f"no recorded response for {key}")
+        status, headers, body, elapsed = entry
+        delay = elapsed if self.latency == "recorded" else float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = key
+        response.reason = "Replayed"
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
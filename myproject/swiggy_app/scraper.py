@@ -1,19 +1,74 @@
 # swiggy_app/scraper.py
 
+import threading
+import time
 import requests
 import json
+from .decode import decode_menu, loads
+from .cache import get_search_cache, location_cell
+from .hedge import Hedger
+from .metrics import (
+    EMPTY_RESULTS, IN_FLIGHT, MENU_FETCH_SECONDS, MENU_PARSE_SECONDS, SEARCH_SECONDS, UPSTREAM_ERRORS,
+    cache_lookup, error_status,
+)
+from .singleflight import SingleFlight
+from .transport import get_transport
 
-class SwiggyScrape:
-    def __init__(self):
-        self.lan, self.lng = self.currentLocation()
+DEFAULT_LOCATION = (25.3167, 83.0104)
+LOCATION_TTL = 3600
+LOCATION_RETRY = 60
 
-    def currentLocation(self):
+
+class LocationResolver:
+    def __init__(self, ttl=LOCATION_TTL, default=DEFAULT_LOCATION):
+        self.ttl = ttl
+        self.default = default
+        self._location = None
+        self._expires = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, transport=None):
+        with self._lock:
+            if self._location is None or time.monotonic() >= self._expires:
+                self._location, resolved = self.lookup(transport or get_transport())
+                # A failed lookup falls back to the default but is retried sooner.
+                self._expires = time.monotonic() + (self.ttl if resolved else min(self.ttl, LOCATION_RETRY))
+            return self._location
+
+    def lookup(self, transport):
         try:
-            response = requests.get("https://ipinfo.io/loc", timeout=5)
+            response = transport.get("https://ipinfo.io/loc", timeout=5)
             response.raise_for_status()
-            return map(float, response.text.strip().split(','))
+            lat, lng = map(float, response.text.strip().split(','))
+            return (lat, lng), True
         except (requests.RequestException, ValueError):
-            return (25.3167,83.0104)
+            return self.default, False
+
+    def clear(self):
+        with self._lock:
+            self._location = None
+            self._expires = 0
+
+
+location_resolver = LocationResolver()
+flights = SingleFlight()
+# Menu requests only; search is a single call per query.
+hedger = Hedger()
+
+
+class SwiggyScrape:
+    def __init__(self, transport=None, lat=None, lng=None, search_cache=None):
+        self.transport = transport or get_transport()
+        self.search_cache = search_cache or get_search_cache()
+        if lat is None or lng is None:
+            lat, lng = self.currentLocation()
+        self.lan, self.lng = lat, lng
+
+    def restaurant(self, ID, **kwargs):
+        return Restaurant(ID, transport=self.transport, lat=self.lan, lng=self.lng, **kwargs)
+
+    def currentLocation(self):
+        return location_resolver.resolve(self.transport)
 
     def getHeaders(self, referer: str):
         return {
@@ -28,7 +83,7 @@ class SwiggyScrape:
 
     def get(self):
         try:
-            response = requests.get(
+            response = self.transport.get(
                 "https://www.swiggy.com/dapi/restaurants/list/v5",
                 headers=self.getHeaders("https://www.swiggy.com/restaurants"),
                 params={
@@ -40,13 +95,23 @@ class SwiggyScrape:
                 timeout=10
             )
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException:
+            return loads(response.content)
+        except (requests.RequestException, ValueError):
             return {}
 
     def getResturants(self, query: str):
+        key = self.search_cache.key(query, self.lan, self.lng)
+        cached = self.search_cache.get(key)
+        cache_lookup("search", cached is not None)
+        if cached is not None:
+            return cached
+        return flights.do(("search", key), self.fetchRestaurants, query, key)
+
+    def fetchRestaurants(self, query, key):
+        start = time.perf_counter()
+        IN_FLIGHT.inc(operation="search")
         try:
-            response = requests.get(
+            response = self.transport.get(
                 "https://www.swiggy.com/dapi/restaurants/search/v3",
                 headers=self.getHeaders(f"https://www.swiggy.com/search?query={query}"),
                 params={
@@ -59,9 +124,18 @@ class SwiggyScrape:
                 timeout=10
             )
             response.raise_for_status()
-            return self.parseRestaurants(response.json())
-        except (requests.RequestException, json.JSONDecodeError):
-            return []
+            restaurants = self.parseRestaurants(loads(response.content))
+        except (requests.RequestException, json.JSONDecodeError) as e:
+            UPSTREAM_ERRORS.inc(endpoint="search", status=error_status(e))
+            restaurants = []
+        finally:
+            IN_FLIGHT.dec(operation="search")
+            SEARCH_SECONDS.observe(time.perf_counter() - start)
+        if restaurants:
+            self.search_cache.set(key, restaurants)
+        else:
+            EMPTY_RESULTS.inc(endpoint="search")
+        return restaurants
 
     def parseRestaurants(self, response_data):
         restaurants = []
@@ -89,9 +163,12 @@ class SwiggyScrape:
             return 0.0
 
 class Restaurant:
-    def __init__(self, ID, start_avg=3, weight=100):
+    def __init__(self, ID, start_avg=3, weight=100, transport=None, lat=None, lng=None):
         self.id = ID
-        self.lan, self.lng = SwiggyScrape().currentLocation()
+        self.transport = transport or get_transport()
+        if lat is None or lng is None:
+            lat, lng = location_resolver.resolve(self.transport)
+        self.lan, self.lng = lat, lng
         self.start_avg = start_avg
         self.weight = weight
 
@@ -106,24 +183,42 @@ class Restaurant:
             clean_str = rating_str.replace(' ratings', '').replace(',', '')
             return float(clean_str) * 1000 if 'K' in rating_str else float(clean_str)
 
+    def parse_lat_long(self, lat_long):
+        # A missing or malformed "lat,lng" leaves the restaurant unplaced
+        # (None) rather than failing the whole menu.
+        try:
+            lat, lng = map(float, str(lat_long).strip().split(","))
+        except ValueError:
+            return None
+        return [lat, lng]
+
     def get(self):
+        with IN_FLIGHT.track(operation="menu"):
+            return flights.do(("menu", self.id, location_cell(self.lan, self.lng)), self.fetch)
+
+    def fetch(self):
         try:
-            response = requests.get(
-                "https://www.swiggy.com/dapi/menu/pl",
-                headers=self.getHeaders(),
-                params={
-                    "page-type": "REGULAR_MENU",
-                    "lat": self.lan,
-                    "lng": self.lng,
-                    "restaurantId": self.id,
-                    "submitAction": "ENTER",
-                },
-                timeout=10
-            )
+            with MENU_FETCH_SECONDS.time():
+                response = hedger.call(lambda: self.transport.get(
+                    "https://www.swiggy.com/dapi/menu/pl",
+                    headers=self.getHeaders(),
+                    params={
+                        "page-type": "REGULAR_MENU",
+                        "lat": self.lan,
+                        "lng": self.lng,
+                        "restaurantId": self.id,
+                        "submitAction": "ENTER",
+                    },
+                    timeout=10
+                ))
             response.raise_for_status()
-            return self.restaurants(response.json())
-        except requests.RequestException:
-            return {"info": {}, "dishes": {}}
+            data = self.restaurants(decode_menu(response.content))
+        except (requests.RequestException, ValueError) as e:
+            UPSTREAM_ERRORS.inc(endpoint="menu", status=error_status(e))
+            data = {"info": {}, "dishes": {}}
+        if not data["info"]:
+            EMPTY_RESULTS.inc(endpoint="menu")
+        return data
 
     def getHeaders(self):
         return {
@@ -134,14 +229,15 @@ class Restaurant:
         }
 
     def restaurants(self, response_data):
-        try:
-            cards = response_data["data"]["cards"]
-            return {
-                "info": self.restaurant_info(cards),
-                "dishes": self.getDishes(cards)
-            }
-        except (KeyError, IndexError):
-            return {"info": {}, "dishes": {}}
+        with MENU_PARSE_SECONDS.time():
+            try:
+                cards = response_data["data"]["cards"]
+                return {
+                    "info": self.restaurant_info(cards),
+                    "dishes": self.getDishes(cards)
+                }
+            except (KeyError, IndexError):
+                return {"info": {}, "dishes": {}}
 
     def restaurant_info(self, cards):
         try:
@@ -150,7 +246,7 @@ class Restaurant:
                 "id": info.get("id"),
                 "name": info.get("name"),
                 "city": info.get("city"),
-                "latLong": list(map(float, str(info.get("latLong")).strip().split(","))),
+                "latLong": self.parse_lat_long(info.get("latLong")),
                 "address": info.get("labels")[1]['message'] if len(info.get("labels", [])) > 1 else "Address not available",
                 "bayesianScore": self.bayesianScore(info.get("avgRating", 0), self.parse_ratings(info.get("totalRatingsString", "0"))),
                 "avgRating": info.get("avgRating", 0),
@@ -0,0 +1,60 @@
+# swiggy_app/snapshots.py
+
+import queue
+import threading
+
+from django.db import DatabaseError, connections, transaction
+
+from .models import RestaurantSnapshot
+
+BATCH_SIZE = 64
+
+
+# Writes menu snapshots on one background thread, so a request hands its menus
+# back without queueing on SQLite's single write lock. Everything submitted
+# since the last write goes in one transaction.
+class SnapshotWriter:
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, data):
+        if not (data and data.get("info")):
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="snapshot-writer", daemon=True)
+                self.thread.start()
+        self.queue.put(data)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            finally:
+                connections.close_all()
+                for _ in batch:
+                    self.queue.task_done()
+
+    def write(self, batch):
+        try:
+            with transaction.atomic():
+                for data in batch:
+                    RestaurantSnapshot.store(data)
+        except DatabaseError:
+            pass
+
+    # Blocks until every submitted snapshot has been written (or dropped).
+    def flush(self):
+        self.queue.join()
+
+
+snapshot_writer = SnapshotWriter()
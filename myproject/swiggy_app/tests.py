@@ -1,3 +1,607 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from unittest import mock
 
-# Create your tests here.
+import aiohttp
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .cache import SearchCache, location_cell, normalize_query
+from .decode import decode_menu
+from .hedge import Hedger
+from .limiter import BREAKER_THRESHOLD, CircuitBreaker, CircuitOpen, HostLimiter
+from .metrics import CACHE_HIT_RATIO, CONTENT_TYPE, Counter, Gauge, Histogram, Registry, cache_lookup, error_status, serve
+from .replay import RecordingTransport, ReplayTransport, request_key
+from .scraper import Restaurant
+from .singleflight import AsyncSingleFlight, SingleFlight
+from . import views
+
+
+def response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = b""
+    resp.raw = io.BytesIO()
+    return resp
+
+
+def menu_payload():
+    dish = {
+        "id": "d1",
+        "name": "Chicken Biryani",
+        "description": "Serves 1",
+        "price": 25000,
+        "finalPrice": 20000,
+        "imageId": "img",
+        "itemAttribute": {"vegClassifier": "NONVEG", "portionSize": "1"},
+        "ratings": {"aggregatedRating": {"rating": "4.3", "ratingCountV2": "120", "ratingCount": "120 ratings"}},
+    }
+    bare = {"id": "d2", "name": "Raita", "price": 4000}
+    info = {
+        "id": "42",
+        "name": "Biryani House",
+        "city": "Hyderabad",
+        "latLong": "17.38,78.45",
+        "labels": [{"title": "Timing", "message": "11-11"}, {"title": "Address", "message": "Road 1"}],
+        "avgRating": 4.2,
+        "totalRatingsString": "1K+ ratings",
+        "cuisines": ["Biryani"],
+        "sla": {"deliveryTime": 30, "minDeliveryTime": 25, "maxDeliveryTime": 35},
+        "availability": {"opened": True},
+    }
+    return {
+        "statusCode": 0,
+        "data": {
+            "cards": [
+                {"card": {"card": {"text": "Biryani House"}}},
+                {"card": {"card": {"tabs": []}}},
+                {"card": {"card": {"info": info}}},
+                {"groupedCard": {"cardGroupMap": {"REGULAR": {"cards": [
+                    {"card": {"card": {"title": "Recommended"}}},
+                    {"card": {"card": {"title": "Biryani", "itemCards": [
+                        {"card": {"info": dish}},
+                        {"card": {"info": bare}},
+                    ]}}},
+                ]}}}},
+            ]
+        },
+    }
+
+
+def menu(restaurant_id, rating=4.0, score=4.0, min_time=20, max_time=30, dishes=1):
+    return {
+        "info": {
+            "id": restaurant_id,
+            "name": f"Restaurant {restaurant_id}",
+            "avgRating": rating,
+            "bayesianScore": score,
+            "delivery": {
+                "deliveryTime": max_time,
+                "minDeliveryTime": min_time,
+                "maxDeliveryTime": max_time,
+                "opened": True,
+            },
+        },
+        "dishes": {f"{restaurant_id}-{i}": {"name": f"Dish {i}", "price": 100} for i in range(dishes)},
+    }
+
+
+class FakeAsyncRestaurant:
+    def __init__(self, data):
+        self.data = data
+
+    async def get(self):
+        return self.data
+
+
+# Stands in for AsyncSwiggyScrape in the async views: search results are the
+# given menus, in order.
+class FakeAsyncScraper:
+    lan, lng = 17.38, 78.45
+
+    def __init__(self, menus):
+        self.menus = {data["info"].get("id", f"empty-{i}"): data for i, data in enumerate(menus)}
+        self.searches = 0
+
+    async def getResturants(self, query):
+        self.searches += 1
+        return [{"id": restaurant_id} for restaurant_id in self.menus]
+
+    def restaurant(self, restaurant_id):
+        return FakeAsyncRestaurant(self.menus[restaurant_id])
+
+
+# Stands in for SwiggyScrape in the threaded views.
+class FakeScraper:
+    lan, lng = 17.38, 78.45
+
+    def __init__(self, restaurant_ids):
+        self.restaurant_ids = restaurant_ids
+
+    def getResturants(self, query):
+        return [{"id": restaurant_id} for restaurant_id in self.restaurant_ids]
+
+
+class NormalizeQueryTests(SimpleTestCase):
+    def test_case_punctuation_and_spacing(self):
+        self.assertEqual(normalize_query("  Chicken-BIRYANI!! "), "chicken biryani")
+
+    def test_plurals(self):
+        self.assertEqual(normalize_query("Pizzas"), "pizza")
+        self.assertEqual(normalize_query("curries"), "curry")
+        self.assertEqual(normalize_query("sandwiches dishes"), "sandwich dish")
+        self.assertEqual(normalize_query("boxes"), "box")
+        self.assertEqual(normalize_query("fries"), normalize_query("fry"))
+
+    def test_words_that_only_look_plural(self):
+        self.assertEqual(normalize_query("hummus"), "hummus")
+        self.assertEqual(normalize_query("bass"), "bass")
+
+
+class SearchCacheTests(SimpleTestCase):
+    def test_key_shares_nearby_locations(self):
+        cache = SearchCache()
+        self.assertEqual(cache.key("Pizzas", 17.3841, 78.4562), cache.key("pizza", 17.3849, 78.4558))
+        self.assertNotEqual(cache.key("pizza", 17.38, 78.45), cache.key("pizza", 17.40, 78.45))
+        self.assertEqual(location_cell(17.384, 78.456), "17.38,78.46")
+
+    def test_entries_expire_after_ttl(self):
+        cache = SearchCache(ttl=0.05)
+        cache.set("k", [1])
+        self.assertEqual(cache.get("k"), [1])
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("k"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SearchCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_sqlite_file_is_shared_between_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), "search.sqlite3")
+        SearchCache(path).set("k", [{"id": "1"}])
+        self.assertEqual(SearchCache(path).get("k"), [{"id": "1"}])
+
+        expired = SearchCache(path, ttl=-1)
+        expired.set("old", [1])
+        self.assertIsNone(SearchCache(path).get("old"))
+
+
+class HostLimiterTests(SimpleTestCase):
+    def test_retry_after_pauses_the_host(self):
+        limiter = HostLimiter("example.com", retries=0)
+        throttled = limiter.call(lambda: response(429, {"Retry-After": "0.3"}))
+        self.assertEqual(throttled.status_code, 429)
+
+        # The next request, whatever it is, waits out the pause.
+        start = time.monotonic()
+        ok = limiter.call(lambda: response(200))
+        self.assertEqual(ok.status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_retries_after_the_pause(self):
+        limiter = HostLimiter("example.com", retries=1)
+        responses = iter([response(503, {"Retry-After": "0.2"}), response(200)])
+        start = time.monotonic()
+        self.assertEqual(limiter.call(lambda: next(responses)).status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_breaker_opens_after_repeated_failures(self):
+        limiter = HostLimiter("example.com", retries=BREAKER_THRESHOLD + 2)
+        limiter.backoff = lambda attempt: 0
+        calls = []
+
+        def send():
+            calls.append(1)
+            raise requests.ConnectionError("down")
+
+        with self.assertRaises(CircuitOpen):
+            limiter.call(send)
+        self.assertEqual(len(calls), BREAKER_THRESHOLD)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_at_threshold(self):
+        breaker = CircuitBreaker(threshold=5, cooldown=60)
+        for _ in range(4):
+            breaker.failure()
+            breaker.check()
+        breaker.failure()
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+
+    def test_half_open_allows_a_single_probe(self):
+        breaker = CircuitBreaker(threshold=5, cooldown=0.05)
+        for _ in range(5):
+            breaker.failure()
+        time.sleep(0.06)
+        breaker.check()
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+
+        breaker.success()
+        breaker.check()
+        breaker.check()
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(threshold=5, cooldown=0.05)
+        for _ in range(5):
+            breaker.failure()
+        time.sleep(0.06)
+        breaker.check()
+        breaker.failure()
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_leader_error_reaches_waiters(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        error = ValueError("upstream failed")
+        calls = []
+        outcomes = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            raise error
+
+        def caller():
+            try:
+                flight.do("menu", fetch)
+            except ValueError as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcomes, [error] * 5)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_async_leader_error_reaches_waiters(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise ValueError("upstream failed")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("menu", fetch) for _ in range(5)), return_exceptions=True)
+
+        outcomes = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+        self.assertEqual(len({id(outcome) for outcome in outcomes}), 1)
+
+
+class HedgerTests(SimpleTestCase):
+    def hedger(self, budget=1.0):
+        hedger = Hedger(enabled=True, budget=budget, min_samples=5)
+        hedger.latencies.extend([0.01] * 5)
+        return hedger
+
+    def test_slow_call_is_hedged(self):
+        hedger = self.hedger()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        self.assertEqual(hedger.call(fetch), "fast")
+        self.assertEqual(hedger.hedged, 1)
+
+    def test_no_hedge_without_budget(self):
+        hedger = self.hedger(budget=0.0)
+        self.assertEqual(hedger.call(lambda: time.sleep(0.05) or "only"), "only")
+        self.assertEqual(hedger.hedged, 0)
+
+
+class DecodeMenuTests(SimpleTestCase):
+    def setUp(self):
+        self.restaurant = Restaurant("42", transport=object(), lat=17.38, lng=78.45)
+
+    def parsed(self, payload, decode):
+        return self.restaurant.restaurants(decode(json.dumps(payload).encode()))
+
+    def test_matches_json_loads(self):
+        payload = menu_payload()
+        self.assertEqual(self.parsed(payload, decode_menu), self.parsed(payload, json.loads))
+
+    def test_matches_json_loads_without_optional_fields(self):
+        payload = menu_payload()
+        del payload["data"]["cards"][3]["groupedCard"]["cardGroupMap"]["REGULAR"]
+        self.assertEqual(self.parsed(payload, decode_menu), self.parsed(payload, json.loads))
+
+    def test_unexpected_shape_falls_back_to_full_decode(self):
+        payload = {"data": {"cards": {"not": "a list"}}}
+        raw = json.dumps(payload).encode()
+        self.assertEqual(decode_menu(raw), json.loads(raw))
+
+
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        errors = Counter("errors_total", "Errors.", ["endpoint", "status"], registry=self.registry)
+        errors.inc(endpoint="menu", status="503")
+        errors.inc(2, endpoint='say "hi"\\\n', status="Timeout")
+        in_flight = Gauge("in_flight", "Waiting.", registry=self.registry)
+        with in_flight.track():
+            self.assertEqual(in_flight.values[()], 1)
+        in_flight.set(0.5)
+        self.assertEqual(self.registry.render(), "\n".join([
+            "# HELP errors_total Errors.",
+            "# TYPE errors_total counter",
+            'errors_total{endpoint="menu",status="503"} 1',
+            'errors_total{endpoint="say \\"hi\\"\\\\\\n",status="Timeout"} 2',
+            "# HELP in_flight Waiting.",
+            "# TYPE in_flight gauge",
+            "in_flight 0.5",
+        ]) + "\n")
+        with self.assertRaises(ValueError):
+            errors.inc(endpoint="menu")
+
+    def test_histogram_buckets_are_cumulative(self):
+        seconds = Histogram("page_seconds", "Pages.", ["view"], buckets=(0.1, 1.0), registry=self.registry)
+        for value in (0.05, 0.5, 0.7, 3.0):
+            seconds.observe(value, view="home")
+        self.assertEqual(self.registry.render().splitlines()[2:], [
+            'page_seconds_bucket{view="home",le="0.1"} 1',
+            'page_seconds_bucket{view="home",le="1.0"} 3',
+            'page_seconds_bucket{view="home",le="+Inf"} 4',
+            'page_seconds_sum{view="home"} 4.25',
+            'page_seconds_count{view="home"} 4',
+        ])
+
+    def test_cache_hit_ratio(self):
+        for hit in (True, True, False):
+            cache_lookup("test-ratio", hit)
+        self.assertIn(("swiggy_cache_hit_ratio", {"cache": "test-ratio"}, 2 / 3), list(CACHE_HIT_RATIO.samples()))
+
+    def test_error_status(self):
+        http_error = requests.HTTPError(response=response(503))
+        self.assertEqual(error_status(http_error), "503")
+        self.assertEqual(error_status(aiohttp.ClientResponseError(None, (), status=429)), "429")
+        self.assertEqual(error_status(requests.ConnectionError()), "ConnectionError")
+        self.assertEqual(error_status(asyncio.TimeoutError()), "TimeoutError")
+
+    def test_metrics_view(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], CONTENT_TYPE)
+        self.assertContains(response, "# TYPE swiggy_page_seconds histogram")
+
+    def test_serve(self):
+        Counter("served_total", "Served.", registry=self.registry).inc()
+        server = serve(0, registry=self.registry)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        host, port = server.server_address
+        self.assertEqual(host, "127.0.0.1")
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as reply:
+            self.assertEqual(reply.headers["Content-Type"], CONTENT_TYPE)
+            self.assertEqual(reply.read().decode(), self.registry.render())
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://{host}:{port}/")
+
+
+# Answers every GET with the next canned response, after a short delay.
+class FakeTransport:
+    def __init__(self, responses, delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.requests = []
+        self.closed = False
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append((url, params))
+        time.sleep(self.delay)
+        return self.responses.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+class ReplayTests(SimpleTestCase):
+    url = "https://www.swiggy.com/dapi/menu/pl"
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "replay.sqlite3")
+
+    def test_request_key_includes_query_params(self):
+        self.assertEqual(request_key(self.url, {"menuId": "1", "lat": 17.38}), f"{self.url}?menuId=1&lat=17.38")
+        self.assertEqual(request_key(f"{self.url}?menuId=1", {"lat": 17.38}), f"{self.url}?menuId=1&lat=17.38")
+        self.assertNotEqual(request_key(self.url, {"menuId": "1"}), request_key(self.url, {"menuId": "2"}))
+
+    def test_round_trip(self):
+        ok = response(200, {"Content-Type": "application/json", "Set-Cookie": "session=1"})
+        ok._content = json.dumps(menu_payload()).encode()
+        limited = response(429, {"Retry-After": "3"})
+        live = FakeTransport([ok, limited], delay=0.05)
+        recorder = RecordingTransport(live, self.path)
+        self.assertIs(recorder.get(self.url, params={"menuId": "1"}), ok)
+        recorder.get(self.url, params={"menuId": "2"})
+        recorder.close()
+        self.assertTrue(live.closed)
+        self.assertEqual(len(recorder.archive), 2)
+
+        replay = ReplayTransport(self.path)
+        replayed = replay.get(self.url, params={"menuId": "1"})
+        self.assertEqual(replayed.status_code, 200)
+        self.assertEqual(replayed.json(), menu_payload())
+        self.assertEqual(replayed.url, f"{self.url}?menuId=1")
+        # Only the headers the scrapers read are kept, case-insensitively.
+        self.assertEqual(replayed.headers["content-type"], "application/json")
+        self.assertNotIn("Set-Cookie", replayed.headers)
+        replayed = replay.get(self.url, params={"menuId": "2"})
+        self.assertEqual((replayed.status_code, replayed.headers["Retry-After"]), (429, "3"))
+
+    def test_unrecorded_request_fails_like_an_unreachable_host(self):
+        RecordingTransport(FakeTransport([response(200)]), self.path).get(self.url, params={"menuId": "1"})
+        with self.assertRaises(requests.ConnectionError):
+            ReplayTransport(self.path).get(self.url, params={"menuId": "3"})
+
+    def test_latency(self):
+        RecordingTransport(FakeTransport([response(200)], delay=0.2), self.path).get(self.url)
+        for latency, low, high in ((0, 0, 0.1), (0.1, 0.1, 0.19), ("recorded", 0.2, 1)):
+            start = time.monotonic()
+            ReplayTransport(self.path, latency).get(self.url)
+            elapsed = time.monotonic() - start
+            self.assertTrue(low <= elapsed < high, (latency, elapsed))
+
+
+class ApiSearchTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.scraper = FakeAsyncScraper([
+            menu("1", rating=3.9, score=3.5, min_time=20, max_time=40),
+            menu("2", rating=4.5, score=4.1, min_time=25, max_time=30),
+            menu("3", rating=4.1, score=4.4, min_time=30, max_time=50),
+            menu("4", rating=4.8, score=3.9, min_time=10, max_time=15),
+            menu("5", rating=3.2, score=3.0, min_time=35, max_time=45),
+            {"info": {}, "dishes": {}},
+        ])
+
+        @contextlib.asynccontextmanager
+        async def scraper(request):
+            yield self.scraper
+
+        for patch in (
+            mock.patch.object(views, "async_scraper", scraper),
+            mock.patch.object(views, "cached_restaurants_data", lambda ids: {}),
+            mock.patch.object(views.snapshot_writer, "submit"),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def search(self, **params):
+        return self.client.get("/api/search", {"q": "biryani", **params})
+
+    def ids(self, response):
+        return [data["info"]["id"] for data in response.json()["results"]]
+
+    def test_validation(self):
+        for params, message in [
+            ({"q": ""}, "q is required"),
+            ({"sort": "price"}, "sort must be one of"),
+            ({"page": "two"}, "page and limit must be integers"),
+            ({"page": "0"}, "page must be >= 1"),
+            ({"limit": "0"}, "limit between 1 and"),
+            ({"limit": str(views.API_MAX_LIMIT + 1)}, "limit between 1 and"),
+        ]:
+            response = self.search(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(message, response.json()["error"])
+
+    def test_paging(self):
+        body = self.search(sort="relevance", limit=2, page=3).json()
+        self.assertEqual((body["total"], body["pages"], body["page"], body["limit"]), (5, 3, 3, 2))
+        self.assertEqual([data["info"]["id"] for data in body["results"]], ["5"])
+        self.assertEqual(self.search(limit=2, page=4).json()["results"], [])
+
+    def test_sorting(self):
+        self.assertEqual(self.ids(self.search(sort="relevance")), ["1", "2", "3", "4", "5"])
+        self.assertEqual(self.ids(self.search()), ["3", "2", "4", "1", "5"])
+        self.assertEqual(self.ids(self.search(sort="rating")), ["4", "2", "3", "1", "5"])
+        self.assertEqual(self.ids(self.search(sort="delivery")), ["2", "4", "5", "1", "3"])
+
+    def test_field_projection(self):
+        results = self.search(sort="relevance", fields="info.name,info.avgRating,info.missing", limit=1).json()["results"]
+        self.assertEqual(results, [{"info": {"name": "Restaurant 1", "avgRating": 3.9}}])
+
+        results = self.search(sort="relevance", fields="dishes", limit=1).json()["results"]
+        self.assertEqual(results, [{"dishes": {"1-0": {"name": "Dish 0", "price": 100}}}])
+
+    def test_repeated_page_is_served_from_cache(self):
+        first = self.search(sort="rating", limit=2)
+        second = self.search(sort="rating", limit=2)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(self.scraper.searches, 1)
+
+        self.search(sort="rating", limit=2, page=2)
+        self.assertEqual(self.scraper.searches, 2)
+
+
+class HomeBudgetTests(SimpleTestCase):
+    def setUp(self):
+        # pending_menus is shared by every request, so each test gets its own
+        # restaurant ids.
+        self.ids = [f"{self._testMethodName}-{n}" for n in range(4)]
+        self.slow = set(self.ids[2:])
+        self.release = threading.Event()
+        self.fetched = []
+
+        def fetch(restaurant_id, swiggy):
+            self.fetched.append(restaurant_id)
+            if restaurant_id in self.slow:
+                self.release.wait(5)
+            return menu(restaurant_id)
+
+        for patch in (
+            mock.patch.object(views, "SwiggyScrape", lambda **kwargs: FakeScraper(self.ids)),
+            mock.patch.object(views, "fetch_restaurant_data", fetch),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.wait_for_menus)
+
+    def wait_for_menus(self):
+        self.release.set()
+        with views.pending_lock:
+            futures = list(views.pending_menus.values())
+        for future in futures:
+            future.result(5)
+
+    @override_settings(SWIGGY_SEARCH_BUDGET=0.2)
+    def test_budget_renders_partial_results(self):
+        start = time.monotonic()
+        response = self.client.get("/", {"q": "biryani"})
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(response.context["partial"])
+        self.assertEqual(response.context["total_restaurants"], 4)
+        self.assertEqual(response.context["restaurants_count"], 2)
+        self.assertContains(response, "Showing 2 of 4 restaurants; the rest are still loading.")
+
+    @override_settings(SWIGGY_SEARCH_BUDGET=0.2)
+    def test_menus_still_loading_are_not_fetched_again(self):
+        self.client.get("/", {"q": "biryani"})
+        self.client.get("/", {"q": "biryani"})
+        self.assertEqual(sorted(self.fetched), sorted(self.ids[:2] * 2 + self.ids[2:]))
+
+    @override_settings(SWIGGY_SEARCH_BUDGET=None)
+    def test_without_budget_waits_for_every_menu(self):
+        self.release.set()
+        response = self.client.get("/", {"q": "biryani"})
+        self.assertFalse(response.context["partial"])
+        self.assertIsNone(response.context["total_restaurants"])
+        self.assertEqual(response.context["restaurants_count"], 4)
+        self.assertNotContains(response, "still loading")
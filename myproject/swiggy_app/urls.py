@@ -5,4 +5,9 @@ from . import views
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('async/', views.home_async, name='home_async'),
+    path('stream/', views.home_stream, name='home_stream'),
+    path('stream/events/', views.search_stream, name='search_stream'),
+    path('api/search', views.api_search, name='api_search'),
+    path('metrics', views.metrics, name='metrics'),
 ]
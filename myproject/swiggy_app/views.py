@@ -1,73 +1,361 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, connections
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
-from .scraper import SwiggyScrape, Restaurant
+from django.template.loader import render_to_string
+from .cache import SearchCache, location_cell
+from .metrics import CONTENT_TYPE, PAGE_SECONDS, REGISTRY, RENDER_SECONDS, cache_lookup
+from .models import RestaurantSnapshot
+from .snapshots import snapshot_writer
+from .async_scraper import AsyncSwiggyScrape, AsyncTransport
+from .scraper import SwiggyScrape, location_resolver
+from .transport import HOST_LIMITS
 
-def fetch_restaurant_data(restaurant_id):
+# Threads only need to cover the swiggy.com pool; the transport's HostLimiter
+# decides how many menu requests are actually in flight.
+MAX_WORKERS = HOST_LIMITS["www.swiggy.com"]
+
+search_cache = SearchCache(settings.SWIGGY_SEARCH_CACHE, ttl=settings.SWIGGY_SEARCH_TTL)
+async_transport = AsyncTransport()
+
+# One pool for every threaded view, so menus left running after a search
+# budget runs out never add up to more than MAX_WORKERS threads.
+menu_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="menu")
+pending_menus = {}
+pending_lock = threading.Lock()
+
+def cached_restaurant_data(restaurant_id):
+    try:
+        snapshot = RestaurantSnapshot.fresh(restaurant_id, settings.SWIGGY_MENU_TTL)
+        data = snapshot.to_data() if snapshot else None
+    except DatabaseError:
+        data = None
+    cache_lookup("snapshot", data is not None)
+    return data
+
+# Snapshots for a whole result set in one query, keyed by restaurant id as a
+# string; restaurants without a fresh snapshot are missing from the dict.
+def cached_restaurants_data(restaurant_ids):
+    try:
+        snapshots = RestaurantSnapshot.fresh_many(restaurant_ids, settings.SWIGGY_MENU_TTL)
+        found = {restaurant_id: snapshot.to_data() for restaurant_id, snapshot in snapshots.items()}
+    except DatabaseError:
+        found = {}
+    for restaurant_id in restaurant_ids:
+        cache_lookup("snapshot", str(restaurant_id) in found)
+    return found
+
+def fetch_restaurant_data(restaurant_id, swiggy):
     try:
-        restaurant = Restaurant(restaurant_id)
-        data = restaurant.get()
+        data = cached_restaurant_data(restaurant_id)
+        if data is None:
+            restaurant = swiggy.restaurant(restaurant_id)
+            data = restaurant.get()
+            snapshot_writer.submit(data)
     except Exception as e:
         data = None
+    finally:
+        # Runs on executor threads, which Django does not clean up after.
+        connections.close_all()
     return data
 
+# A menu already queued or running for another request is waited on rather
+# than queued again.
+def submit_menu(restaurant_id, swiggy):
+    key = (restaurant_id, location_cell(swiggy.lan, swiggy.lng))
+    with pending_lock:
+        future = pending_menus.get(key)
+        if future is not None:
+            return future
+        future = pending_menus[key] = menu_executor.submit(fetch_restaurant_data, restaurant_id, swiggy)
+    future.add_done_callback(lambda _: forget_menu(key, future))
+    return future
+
+def forget_menu(key, future):
+    with pending_lock:
+        if pending_menus.get(key) is future:
+            del pending_menus[key]
+
+class SearchSummary:
+    def __init__(self):
+        self.restaurant_details = []
+        self.total_open = 0
+        self.total_closed = 0
+        self.all_ratings = []
+        self.fastest_delivery = 999
+
+    def add(self, data):
+        if not (data and data.get("info",{"deliveryTime":999})):
+            return False
+        info = data["info"]
+
+        # Metrics calculations
+        if info["delivery"].get("opened"):
+            self.total_open += 1
+        else:
+            self.total_closed += 1
+        try:
+            rating = float(info.get("avgRating", 0))
+        except (ValueError, TypeError):
+            rating = 0
+        self.all_ratings.append(rating)
+        delivery_time = info["delivery"].get("deliveryTime", 999)
+        if delivery_time < self.fastest_delivery:
+            self.fastest_delivery = delivery_time
+        self.restaurant_details.append(data)
+        return True
+
+    def metrics(self):
+        return {
+            "restaurants_count": len(self.restaurant_details),
+            "total_open": self.total_open,
+            "average_rating": round(sum(self.all_ratings) / len(self.all_ratings), 1) if self.all_ratings else 0,
+            "fastest_delivery": self.fastest_delivery if self.fastest_delivery != 999 else 0,
+        }
+
+    def context(self, query, error_message=None, total=None):
+        self.restaurant_details.sort(key=lambda data: data["info"].get("bayesianScore", 0), reverse=True)
+        return {
+            "query": query,
+            "error": error_message,
+            "partial": total is not None and len(self.restaurant_details) < total,
+            "total_restaurants": total,
+            **self.metrics(),
+            "restaurant_details": self.restaurant_details,
+        }
+
+# Records the view's total time in swiggy_page_seconds{view=name}.
+def timed(name):
+    def decorate(view):
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                with PAGE_SECONDS.time(view=name):
+                    return await view(request, *args, **kwargs)
+        else:
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                with PAGE_SECONDS.time(view=name):
+                    return view(request, *args, **kwargs)
+        return wrapper
+    return decorate
+
+@timed("home")
 def home(request):
     query = request.GET.get('q', '')
-    restaurant_details = []
+    summary = SearchSummary()
     error_message = None
-
-    # Metrics variables
-    total_open = 0
-    total_closed = 0
-    all_ratings = []
-    fastest_delivery = 999
+    total = None
 
     if query:
-        swiggy = SwiggyScrape()
+        budget = settings.SWIGGY_SEARCH_BUDGET
+        deadline = None if budget is None else time.monotonic() + budget
+        swiggy = SwiggyScrape(search_cache=search_cache)
         try:
             restaurants = swiggy.getResturants(query)
         except Exception as e:
             error_message = f"Failed to fetch restaurants: {str(e)}"
             restaurants = []
         if restaurants:
-            # Use ThreadPoolExecutor to fetch data concurrently
-            with ThreadPoolExecutor(max_workers=16) as executor:
-                future_to_rest = {
-                    executor.submit(fetch_restaurant_data, rest["id"]): rest["id"]
-                    for rest in restaurants
-                }
-                for future in as_completed(future_to_rest):
-                    data = future.result()
-                    if data and data.get("info",{"deliveryTime":999}):
-                        info = data["info"]
-
-                        # Metrics calculations
-                        if info["delivery"].get("opened"):
-                            total_open += 1
-                        else:
-                            total_closed += 1
-                        try:
-                            rating = float(info.get("avgRating", 0))
-                        except (ValueError, TypeError):
-                            rating = 0
-                        all_ratings.append(rating)
-                        delivery_time = info["delivery"].get("deliveryTime", 999)
-                        if delivery_time < fastest_delivery:
-                            fastest_delivery = delivery_time
-                        restaurant_details.append(data)
-
-    # Compute aggregate metrics
-    restaurants_count = len(restaurant_details)
-    average_rating = round(sum(all_ratings) / len(all_ratings), 1) if all_ratings else 0
-    fastest_delivery = fastest_delivery if fastest_delivery != 999 else 0
-    restaurant_details.sort(key=lambda data: data["info"].get("bayesianScore", 0), reverse=True)
-    
-    context = {
-        "query": query,
-        "error": error_message,
-        "restaurants_count": restaurants_count,
-        "average_rating": average_rating,
-        "fastest_delivery": fastest_delivery,
-        "restaurant_details": restaurant_details,
-    }
+            # Menus that miss the search budget are not cancelled: they finish
+            # on menu_executor and store their snapshots for the next request.
+            futures = [submit_menu(rest["id"], swiggy) for rest in restaurants]
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                for future in as_completed(futures, timeout=timeout):
+                    summary.add(future.result())
+            except FuturesTimeout:
+                total = len(restaurants)
+
+    with RENDER_SECONDS.time(view="home"):
+        return render(request, 'swiggy_app/home.html', summary.context(query, error_message, total))
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+# Same page as home, rendered empty; the template then fills it from search_stream.
+def home_stream(request):
+    query = request.GET.get('q', '')
+    context = SearchSummary().context(query)
+    context["streaming"] = True
     return render(request, 'swiggy_app/home.html', context)
+
+# Server-sent events: one "restaurant" event per menu as soon as it arrives,
+# carrying the rendered card and the running metrics, then a final "done".
+def search_stream(request):
+    query = request.GET.get('q', '')
+
+    def events():
+        summary = SearchSummary()
+        if query:
+            swiggy = SwiggyScrape(search_cache=search_cache)
+            try:
+                restaurants = swiggy.getResturants(query)
+            except Exception as e:
+                yield sse("failed", {"error": f"Failed to fetch restaurants: {str(e)}"})
+                return
+            if restaurants:
+                futures = [submit_menu(rest["id"], swiggy) for rest in restaurants]
+                for future in as_completed(futures):
+                    data = future.result()
+                    if summary.add(data):
+                        card = render_to_string(
+                            'swiggy_app/_restaurant_card.html',
+                            {"data": data, "index": len(summary.restaurant_details)},
+                        )
+                        yield sse("restaurant", {
+                            "html": card,
+                            "score": data["info"].get("bayesianScore", 0),
+                            "metrics": summary.metrics(),
+                        })
+        yield sse("done", summary.metrics())
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+# Async views look their snapshots up in one batch (a single hop to Django's
+# sync thread per request), so this only runs for the misses.
+async def fetch_restaurant_data_async(restaurant_id, swiggy):
+    try:
+        data = await swiggy.restaurant(restaurant_id).get()
+        snapshot_writer.submit(data)
+    except Exception:
+        data = None
+    return data
+
+# Under ASGI every request runs on the server's one event loop, so the shared
+# transport keeps a single session. Under WSGI Django gives each async view a
+# new loop; a per-loop session there would never be closed, so the scraper
+# gets its own transport and closes it with the request.
+@contextlib.asynccontextmanager
+async def async_scraper(request):
+    # The ipinfo lookup is blocking, so resolve it (once per TTL) off the loop.
+    lat, lng = await sync_to_async(location_resolver.resolve, thread_sensitive=False)()
+    transport = async_transport if isinstance(request, ASGIRequest) else None
+    async with AsyncSwiggyScrape(transport=transport, lat=lat, lng=lng, search_cache=search_cache) as swiggy:
+        yield swiggy
+
+# Same page as home, but the search and every menu fetch share one event loop
+# instead of a thread pool. Serve it through myproject.asgi under uvicorn.
+@timed("home_async")
+async def home_async(request):
+    query = request.GET.get('q', '')
+    summary = SearchSummary()
+    error_message = None
+
+    if query:
+        async with async_scraper(request) as swiggy:
+            try:
+                restaurants = await swiggy.getResturants(query)
+            except Exception as e:
+                error_message = f"Failed to fetch restaurants: {str(e)}"
+                restaurants = []
+            cached = await sync_to_async(cached_restaurants_data)([rest["id"] for rest in restaurants])
+            for data in cached.values():
+                summary.add(data)
+            misses = [rest["id"] for rest in restaurants if str(rest["id"]) not in cached]
+            for fetch in asyncio.as_completed([fetch_restaurant_data_async(restaurant_id, swiggy) for restaurant_id in misses]):
+                summary.add(await fetch)
+
+    with RENDER_SECONDS.time(view="home_async"):
+        return render(request, 'swiggy_app/home.html', summary.context(query, error_message))
+
+API_SORTS = {
+    "relevance": None,
+    "bayesian": (lambda data: data["info"].get("bayesianScore", 0), True),
+    "rating": (lambda data: data["info"].get("avgRating", 0), True),
+    "delivery": (
+        lambda data: (data["info"]["delivery"].get("maxDeliveryTime") or 0)
+        - (data["info"]["delivery"].get("minDeliveryTime") or 0),
+        False,
+    ),
+}
+API_MAX_LIMIT = 100
+
+def project(data, fields):
+    if not fields:
+        return data
+    projected = {}
+    for field in fields:
+        top, _, sub = field.partition(".")
+        if top not in data:
+            continue
+        if not sub:
+            projected[top] = data[top]
+        elif projected.get(top) is not data[top] and sub in data[top]:
+            projected.setdefault(top, {})[sub] = data[top][sub]
+    return projected
+
+def api_error(message, status=400):
+    return HttpResponse(json.dumps({"error": message}), status=status, content_type="application/json")
+
+# /api/search?q=Biryani&page=1&limit=20&sort=bayesian&fields=info.name,info.avgRating
+# Serialized pages are cached, so repeated polls skip the fan-out and json.dumps.
+@timed("api_search")
+async def api_search(request):
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', 'bayesian')
+    fields = sorted(filter(None, request.GET.get('fields', '').split(',')))
+    try:
+        page = int(request.GET.get('page', 1))
+        limit = int(request.GET.get('limit', 20))
+    except ValueError:
+        return api_error("page and limit must be integers")
+    if not query:
+        return api_error("q is required")
+    if sort not in API_SORTS:
+        return api_error(f"sort must be one of: {', '.join(API_SORTS)}")
+    if page < 1 or not 1 <= limit <= API_MAX_LIMIT:
+        return api_error(f"page must be >= 1 and limit between 1 and {API_MAX_LIMIT}")
+
+    async with async_scraper(request) as swiggy:
+        search_key = search_cache.key(query, swiggy.lan, swiggy.lng)
+        cache_key = "api-search:" + hashlib.sha1(
+            f"{search_key}|{sort}|{','.join(fields)}|{page}|{limit}".encode()
+        ).hexdigest()
+        payload = await cache.aget(cache_key)
+        cache_lookup("api", payload is not None)
+        if payload is None:
+            restaurants = await swiggy.getResturants(query)
+            cached = await sync_to_async(cached_restaurants_data)([rest["id"] for rest in restaurants])
+            misses = [rest["id"] for rest in restaurants if str(rest["id"]) not in cached]
+            fetched = dict(zip(misses, await asyncio.gather(
+                *(fetch_restaurant_data_async(restaurant_id, swiggy) for restaurant_id in misses)
+            )))
+            # Search order, which the "relevance" sort keeps.
+            menus = [cached.get(str(rest["id"])) or fetched.get(rest["id"]) for rest in restaurants]
+            results = [data for data in menus if data and data.get("info")]
+            if API_SORTS[sort]:
+                key, reverse = API_SORTS[sort]
+                results.sort(key=key, reverse=reverse)
+
+            start = (page - 1) * limit
+            payload = json.dumps({
+                "query": query,
+                "sort": sort,
+                "page": page,
+                "limit": limit,
+                "total": len(results),
+                "pages": (len(results) + limit - 1) // limit,
+                "results": [project(data, fields) for data in results[start:start + limit]],
+            }).encode()
+            if results:
+                await cache.aset(cache_key, payload, settings.SWIGGY_API_CACHE_TTL)
+    return HttpResponse(payload, content_type="application/json")
+
+# Prometheus scrape target. Values are per worker process.
+def metrics(request):
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from swiggy.scrape import SwiggyScrape, Restaurant, location_resolver
+from swiggy.decode import decode_menu, loads
+from swiggy.cache import get_search_cache, location_cell
+from swiggy.metrics import (
+    EMPTY_RESULTS, IN_FLIGHT, MENU_FETCH_SECONDS, SEARCH_SECONDS, UPSTREAM_ERRORS, cache_lookup, error_status,
+)
+from swiggy.singleflight import AsyncSingleFlight
+from swiggy.transport import HOST_LIMITS
+
+CONCURRENCY = 32
+CONNECTION_LIMIT = 100
+
+flights = AsyncSingleFlight()
+
+
+# aiohttp counterpart of Transport: one keep-alive session per event loop,
+# with the same per-host connection limits. Sessions and semaphores cannot be
+# shared between loops, so each loop that uses the transport gets its own.
+class AsyncTransport:
+    def __init__(self, limit=CONNECTION_LIMIT, host_limits=None, upstream=None):
+        self.limit = limit
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        # Same SWIGGY_UPSTREAM override as Transport.
+        upstream = upstream or os.environ.get("SWIGGY_UPSTREAM")
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self._loops = weakref.WeakKeyDictionary()
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None or state["session"].closed:
+            state = self._loops[loop] = {
+                "session": aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.limit),
+                    cookie_jar=aiohttp.DummyCookieJar(),
+                ),
+                "slots": {},
+            }
+        return state
+
+    def session(self):
+        return self._state()["session"]
+
+    def slot(self, host):
+        slots = self._state()["slots"]
+        if host not in slots:
+            slots[host] = asyncio.Semaphore(self.host_limits.get(host, self.limit))
+        return slots[host]
+
+    async def get(self, url, params=None, headers=None, timeout=10):
+        params = {key: str(value) for key, value in (params or {}).items()}
+        parts = urlsplit(url)
+        if self.upstream:
+            url = self.upstream + parts.path + (f"?{parts.query}" if parts.query else "")
+        async with self.slot(parts.hostname):
+            async with self.session().get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                response.raise_for_status()
+                return await response.read()
+
+    async def close(self):
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state["session"].close()
+
+
+class AsyncSwiggyScrape(SwiggyScrape):
+    def __init__(self, transport=None, lat=None, lng=None, search_cache=None, concurrency=CONCURRENCY):
+        # Only a transport created here is closed with the scraper.
+        self.owns_transport = transport is None
+        self.transport = transport or AsyncTransport()
+        self.search_cache = search_cache or get_search_cache()
+        if lat is None or lng is None:
+            lat, lng = self.currentLocation()
+        self.lan, self.lng = lat, lng
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.owns_transport:
+            await self.transport.close()
+
+    def currentLocation(self):
+        # Resolved once per TTL through the shared sync transport.
+        return location_resolver.resolve()
+
+    def restaurant(self, ID, **kwargs):
+        return AsyncRestaurant(ID, transport=self.transport, lat=self.lan, lng=self.lng, semaphore=self.semaphore, **kwargs)
+
+    async def get(self):
+        try:
+            async with self.semaphore:
+                body = await self.transport.get(
+                    "https://www.swiggy.com/dapi/restaurants/list/v5",
+                    headers=self.getHeaders("https://www.swiggy.com/restaurants"),
+                    params={
+                        "lat": self.lan,
+                        "lng": self.lng,
+                        "is-seo-homepage-enabled": "true",
+                        "page_type": "DESKTOP_WEB_LISTING",
+                    },
+                    timeout=10
+                )
+            return loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return {}
+
+    async def getResturants(self, query: str):
+        key = self.search_cache.key(query, self.lan, self.lng)
+        # The cache may be backed by SQLite; keep its file I/O off the loop.
+        cached = await asyncio.to_thread(self.search_cache.get, key)
+        cache_lookup("search", cached is not None)
+        if cached is not None:
+            return cached
+        return await flights.do(("search", key), self.fetchRestaurants, query, key)
+
+    async def fetchRestaurants(self, query, key):
+        start = time.perf_counter()
+        IN_FLIGHT.inc(operation="search")
+        try:
+            async with self.semaphore:
+                body = await self.transport.get(
+                    "https://www.swiggy.com/dapi/restaurants/search/v3",
+                    headers=self.getHeaders(f"https://www.swiggy.com/search?query={query}"),
+                    params={
+                        "lat": self.lan,
+                        "lng": self.lng,
+                        "str": query,
+                        "submitAction": "ENTER",
+                        "selectedPLTab": "RESTAURANT",
+                    },
+                    timeout=10
+                )
+            restaurants = self.parseRestaurants(loads(body))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            UPSTREAM_ERRORS.inc(endpoint="search", status=error_status(e))
+            restaurants = []
+        finally:
+            IN_FLIGHT.dec(operation="search")
+            SEARCH_SECONDS.observe(time.perf_counter() - start)
+        if restaurants:
+            await asyncio.to_thread(self.search_cache.set, key, restaurants)
+        else:
+            EMPTY_RESULTS.inc(endpoint="search")
+        return restaurants
+
+    async def search(self, query: str):
+        restaurants = await self.getResturants(query)
+        return await asyncio.gather(*(self.restaurant(rest["id"]).get() for rest in restaurants))
+
+
+class AsyncRestaurant(Restaurant):
+    def __init__(self, ID, start_avg=3, weight=100, transport=None, lat=None, lng=None, semaphore=None):
+        self.id = ID
+        self.transport = transport or AsyncTransport()
+        if lat is None or lng is None:
+            lat, lng = location_resolver.resolve()
+        self.lan, self.lng = lat, lng
+        self.start_avg = start_avg
+        self.weight = weight
+        self.semaphore = semaphore or asyncio.Semaphore(CONCURRENCY)
+
+    async def get(self):
+        with IN_FLIGHT.track(operation="menu"):
+            return await flights.do(("menu", self.id, location_cell(self.lan, self.lng)), self.fetch)
+
+    async def fetch(self):
+        try:
+            with MENU_FETCH_SECONDS.time():
+                async with self.semaphore:
+                    body = await self.transport.get(
+                        "https://www.swiggy.com/dapi/menu/pl",
+                        headers=self.getHeaders(),
+                        params={
+                            "page-type": "REGULAR_MENU",
+                            "lat": self.lan,
+                            "lng": self.lng,
+                            "restaurantId": self.id,
+                            "submitAction": "ENTER",
+                        },
+                        timeout=10
+                    )
+            data = self.restaurants(decode_menu(body))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            UPSTREAM_ERRORS.inc(endpoint="menu", status=error_status(e))
+            data = {"info": {}, "dishes": {}}
+        if not data["info"]:
+            EMPTY_RESULTS.inc(endpoint="menu")
+        return data
+
+
+if __name__ == "__main__":
+    async def run():
+        async with AsyncSwiggyScrape() as swiggy:
+            menus = await swiggy.search("Biryani")
+            print(f"Fetched {sum(1 for menu in menus if menu['info'])} of {len(menus)} menus")
+
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+VEG_CLASSES = ["VEG", "NON_VEG", "NONVEG", "EGG"]
+DISH_FIELDS = ["name", "description", "price", "finalPrice", "vegClassifier", "rating", "ratingCount"]
+# Substring queries shorter than a trigram cannot use the index's postings;
+# the vectorized scan in DishStore.mask is faster for them.
+MIN_INDEXED_SUBSTRING = 3
+
+
+# One row per dish across every restaurant in a result set, so dish search,
+# price filters and dietary tags are column operations instead of loops over
+# per-restaurant dish lists.
+class DishStore:
+    def __init__(self, restaurants):
+        restaurant_ids, dish_ids, dishes = [], [], []
+        for r in restaurants:
+            info = r.get("info") or {}
+            menu = r.get("dishes") or {}
+            if not info or not menu:
+                continue
+            restaurant_ids.extend([info.get("id")] * len(menu))
+            dish_ids.extend(menu.keys())
+            dishes.extend(menu.values())
+
+        frame = pd.DataFrame.from_records(dishes, columns=DISH_FIELDS)
+        frame.insert(0, "restaurant_id", pd.array(restaurant_ids, dtype=object))
+        frame.insert(1, "dish_id", pd.array(dish_ids, dtype=object))
+        frame["name"] = frame["name"].fillna("")
+        for column in ["price", "finalPrice", "rating", "ratingCount"]:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        classifier = frame["vegClassifier"].fillna("").astype(str).str.upper()
+        frame["vegClassifier"] = pd.Categorical(
+            classifier, categories=sorted(set(VEG_CLASSES) | set(classifier.unique()))
+        )
+        frame["name_lower"] = frame["name"].astype(str).str.lower()
+        # Same rule as the price chart: the discounted price when there is one.
+        frame["effectivePrice"] = frame["finalPrice"].where(frame["finalPrice"] > 0, frame["price"]).fillna(0)
+        self.frame = frame
+
+    def __len__(self):
+        return len(self.frame)
+
+    def max_price(self):
+        return float(self.frame["effectivePrice"].max()) if len(self.frame) else 0.0
+
+    def mask(self, term=None, max_price=None):
+        mask = np.ones(len(self.frame), dtype=bool)
+        if term:
+            mask &= self.frame["name_lower"].str.contains(term.lower(), regex=False).to_numpy()
+        if max_price is not None:
+            mask &= (self.frame["effectivePrice"] <= max_price).to_numpy()
+        return mask
+
+    def matching_restaurants(self, term=None, max_price=None, index=None, mode="substring"):
+        term = term.strip() if term else term
+        if index is None or not term or (mode == "substring" and len(term) < MIN_INDEXED_SUBSTRING):
+            return self.frame.loc[self.mask(term, max_price), "restaurant_id"].unique()
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[index.search(term, mode)] = True
+        mask &= self.mask(max_price=max_price)
+        return self.frame.loc[mask, "restaurant_id"].unique()
+
+    def tags(self):
+        # Classify each distinct vegClassifier once, then spread by category code.
+        labels = np.array(["Veg", "Non-Veg", "Egg"])
+        categories = self.frame["vegClassifier"].cat.categories
+        per_category = np.array(
+            [["VEG" in c, "NON_VEG" in c, "EGG" in c] for c in categories], dtype=bool
+        ).reshape(len(categories), 3)
+        flags = pd.DataFrame(
+            per_category[self.frame["vegClassifier"].cat.codes.to_numpy()], columns=labels
+        )
+        present = flags.groupby(self.frame["restaurant_id"].to_numpy(), sort=False).any()
+        return {
+            restaurant_id: list(labels[row])
+            for restaurant_id, row in zip(present.index, present.to_numpy())
+        }
@@ -0,0 +1,23 @@
+from concurrent.futures import as_completed, TimeoutError as FuturesTimeout
+
+# Enough threads to saturate the swiggy.com pool; how many requests are
+# actually in flight is decided by the transport's HostLimiter.
+MAX_WORKERS = 32
+SEARCH_BUDGET = 20
+
+
+# Runs fn over items on executor and yields each result as soon as it
+# completes. Whatever has not finished after budget seconds is dropped: queued
+# calls are cancelled, running ones finish on the executor's threads.
+# budget=None waits for everything. The executor is shared and never shut
+# down here, so abandoned searches cannot add threads beyond its size.
+def fan_out(fn, items, executor, budget=SEARCH_BUDGET):
+    futures = [executor.submit(fn, item) for item in items]
+    try:
+        for future in as_completed(futures, timeout=budget):
+            yield future.result()
+    except FuturesTimeout:
+        pass
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+# Off unless SWIGGY_HEDGE is set: hedging trades extra upstream requests for
+# a shorter tail.
+HEDGE = os.environ.get("SWIGGY_HEDGE", "") not in ("", "0")
+
+# A duplicate is sent once a request has been outstanding longer than this
+# percentile of recent latencies...
+HEDGE_PERCENTILE = 95
+# ...as long as hedges stay under this fraction of all requests.
+HEDGE_BUDGET = 0.1
+MAX_CREDITS = 10
+
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+HEDGE_WORKERS = 64
+
+
+class Hedger:
+    def __init__(self, enabled=HEDGE, percentile=HEDGE_PERCENTILE, budget=HEDGE_BUDGET,
+                 window=LATENCY_WINDOW, min_samples=MIN_SAMPLES, max_workers=HEDGE_WORKERS):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.latencies = deque(maxlen=window)
+        self.credits = 0.0
+        self.hedged = 0
+        self.lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+        return self._executor
+
+    def delay(self):
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, len(ordered) * self.percentile // 100)]
+
+    def timed(self, fn):
+        start = time.monotonic()
+        result = fn()
+        with self.lock:
+            self.latencies.append(time.monotonic() - start)
+        return result
+
+    def spend(self):
+        with self.lock:
+            if self.credits < 1:
+                return False
+            self.credits -= 1
+            self.hedged += 1
+            return True
+
+    # Runs fn, and if it is still running after delay() seconds runs it again
+    # concurrently; the first successful result wins. The loser is left to
+    # finish on its own thread.
+    def call(self, fn):
+        if not self.enabled:
+            return fn()
+        with self.lock:
+            self.credits = min(MAX_CREDITS, self.credits + self.budget)
+        delay = self.delay()
+        if delay is None:
+            # Not enough history for a meaningful percentile yet.
+            return self.timed(fn)
+
+        primary = self.executor.submit(self.timed, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.spend():
+            return primary.result()
+
+        hedge = self.executor.submit(self.timed, fn)
+        error = None
+        for future in as_completed([primary, hedge]):
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+        raise error
@@ -0,0 +1,114 @@
+import hashlib
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+
+FUZZY_THRESHOLD = 0.5
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def tokens(text):
+    return re.findall(r"\w+", text)
+
+
+# Token and trigram postings over dish names. Lookups return dish positions
+# (row numbers in DishStore.frame) and only touch the postings of the query's
+# own tokens/trigrams instead of every dish name.
+class DishIndex:
+    def __init__(self, names):
+        self.names = [str(name).lower() for name in names]
+        self.token_postings = defaultdict(set)
+        self.trigram_postings = defaultdict(set)
+        for position, name in enumerate(self.names):
+            for token in tokens(name):
+                self.token_postings[token].add(position)
+            for gram in trigrams(name):
+                self.trigram_postings[gram].add(position)
+        self.sorted_tokens = sorted(self.token_postings)
+
+        # Fuzzy lookups compare words against the (much smaller) vocabulary.
+        self.token_trigrams = defaultdict(set)
+        self.token_gram_counts = {}
+        for token in self.sorted_tokens:
+            grams = trigrams(f"  {token} ")
+            self.token_gram_counts[token] = len(grams)
+            for gram in grams:
+                self.token_trigrams[gram].add(token)
+
+    def __len__(self):
+        return len(self.names)
+
+    # The index depends only on the names and their order, so result sets
+    # with the same dish names share one.
+    @classmethod
+    def signature(cls, names):
+        digest = hashlib.sha1()
+        for name in names:
+            digest.update(f"{name}\x01".encode())
+        return digest.hexdigest()
+
+    def search(self, query, mode="substring"):
+        query = query.strip().lower()
+        if not query:
+            return np.arange(len(self.names))
+        if mode == "prefix":
+            positions = self.prefix(query)
+        elif mode == "fuzzy":
+            positions = self.fuzzy(query)
+        else:
+            positions = self.substring(query)
+        return np.fromiter(sorted(positions), dtype=np.int64, count=len(positions))
+
+    def substring(self, query):
+        grams = trigrams(query)
+        if grams:
+            postings = sorted((self.trigram_postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set.intersection(*postings)
+        else:
+            # One or two characters: narrow down through the tokens containing them.
+            candidates = set()
+            for token in self.sorted_tokens:
+                if query in token:
+                    candidates |= self.token_postings[token]
+            if not candidates:
+                candidates = range(len(self.names))
+        return {position for position in candidates if query in self.names[position]}
+
+    def prefix(self, query):
+        # Every query word must start some word of the dish name.
+        result = None
+        for word in tokens(query):
+            matches = set()
+            start = bisect_left(self.sorted_tokens, word)
+            for token in self.sorted_tokens[start:]:
+                if not token.startswith(word):
+                    break
+                matches |= self.token_postings[token]
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result or set()
+
+    def fuzzy(self, query, threshold=FUZZY_THRESHOLD):
+        # Every query word must resemble some word of the dish name (Dice
+        # coefficient over padded trigrams), so "biryni" still finds biryani.
+        result = None
+        for word in tokens(query):
+            grams = trigrams(f"  {word} ")
+            shared = defaultdict(int)
+            for gram in grams:
+                for token in self.token_trigrams.get(gram, ()):
+                    shared[token] += 1
+            matches = set()
+            for token, count in shared.items():
+                if 2 * count / (len(grams) + self.token_gram_counts[token]) >= threshold:
+                    matches |= self.token_postings[token]
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result or set()
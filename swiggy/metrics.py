@@ -0,0 +1,241 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus-style counters, gauges and histograms, rendered in the text
+# exposition format. Values are per process: with several workers, scrape
+# each one.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    pairs = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                    lines.append(f"{name}{{{pairs}}} {_format(value)}")
+                else:
+                    lines.append(f"{name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            yield self.name, self.labels(key), value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self.lock:
+            return self.values.get(self.key(labels), 0)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    @contextmanager
+    def track(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+# A gauge computed at scrape time from other metrics.
+class DerivedGauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames, compute, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.compute = compute
+
+    def samples(self):
+        for key, value in sorted(self.compute()):
+            yield self.name, self.labels(key), value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self.lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+        for key, (counts, total) in items:
+            labels = self.labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+SEARCH_SECONDS = Histogram(
+    "swiggy_search_seconds", "Upstream restaurant search, request and parse.",
+)
+MENU_FETCH_SECONDS = Histogram(
+    "swiggy_menu_fetch_seconds", "Upstream menu request, including retries and hedges.",
+)
+MENU_PARSE_SECONDS = Histogram(
+    "swiggy_menu_parse_seconds", "Time spent in Restaurant.restaurants.", buckets=PARSE_BUCKETS,
+)
+PAGE_SECONDS = Histogram(
+    "swiggy_page_seconds", "Time to build a results page.", ["view"],
+)
+RENDER_SECONDS = Histogram(
+    "swiggy_render_seconds", "Template or Streamlit rendering part of a results page.", ["view"],
+)
+UPSTREAM_ERRORS = Counter(
+    "swiggy_upstream_errors_total", "Failed upstream requests by HTTP status or exception.", ["endpoint", "status"],
+)
+EMPTY_RESULTS = Counter(
+    "swiggy_empty_results_total", "Searches and menus that fell back to an empty result.", ["endpoint"],
+)
+CACHE_REQUESTS = Counter(
+    "swiggy_cache_requests_total", "Cache lookups by cache and result (hit or miss).", ["cache", "result"],
+)
+IN_FLIGHT = Gauge(
+    "swiggy_in_flight", "Searches and menu fetches currently waited on.", ["operation"],
+)
+
+
+def _hit_ratios():
+    totals = {}
+    with CACHE_REQUESTS.lock:
+        for (cache, result), count in CACHE_REQUESTS.values.items():
+            hits, lookups = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (count if result == "hit" else 0), lookups + count)
+    return [((cache,), hits / lookups) for cache, (hits, lookups) in totals.items() if lookups]
+
+
+CACHE_HIT_RATIO = DerivedGauge(
+    "swiggy_cache_hit_ratio", "Share of cache lookups that were hits since start.", ["cache"], _hit_ratios,
+)
+
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def error_status(error):
+    # HTTP status when there is one (requests and aiohttp), else the exception type.
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status", None)
+    return str(status) if status else type(error).__name__
+
+
+# Serves /metrics on its own port, for processes without a web framework
+# (the Streamlit app). Only local scrapers can reach it unless the caller
+# passes a public host.
+def serve(port, host="127.0.0.1", registry=REGISTRY):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,165 @@
+import sys
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+
+class VegClass(str, Enum):
+    VEG = "VEG"
+    NON_VEG = "NON_VEG"
+    NONVEG = "NONVEG"
+    EGG = "EGG"
+
+    @classmethod
+    def of(cls, value):
+        try:
+            return cls(value)
+        except ValueError:
+            # Unknown classifiers are kept verbatim, but only one copy of each.
+            return sys.intern(value) if isinstance(value, str) else value
+
+
+def _interned(values):
+    return tuple(sys.intern(value) if isinstance(value, str) else value for value in values or ())
+
+
+# Slotted records for what Restaurant.get() returns. A menu with a few hundred
+# dishes takes about a quarter less memory as records than as nested dicts.
+# It pickles (for st.cache_data) as plain tuples, which is only ~10% smaller:
+# pickle already memoizes the repeated dict keys, and the strings dominate.
+@dataclass(slots=True)
+class Dish:
+    id: str
+    name: str
+    description: str
+    price: float
+    finalPrice: float
+    vegClassifier: object
+    rating: object
+    ratingCount: object
+
+    @classmethod
+    def from_dict(cls, dish_id, dish):
+        return cls(
+            dish_id,
+            dish.get("name"),
+            dish.get("description"),
+            dish.get("price", 0),
+            dish.get("finalPrice", 0),
+            VegClass.of(dish.get("vegClassifier", "NON_VEG")),
+            dish.get("rating", 0),
+            dish.get("ratingCount", 0),
+        )
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "description": self.description,
+            "price": self.price,
+            "finalPrice": self.finalPrice,
+            "vegClassifier": self.vegClassifier.value if isinstance(self.vegClassifier, VegClass) else self.vegClassifier,
+            "rating": self.rating,
+            "ratingCount": self.ratingCount,
+        }
+
+    def to_tuple(self):
+        return (self.id, self.name, self.description, self.price, self.finalPrice,
+                self.vegClassifier, self.rating, self.ratingCount)
+
+
+@dataclass(slots=True)
+class RestaurantInfo:
+    id: str
+    name: str
+    city: str
+    latLong: Optional[tuple]
+    address: str
+    bayesianScore: float
+    avgRating: float
+    totalRatings: float
+    cuisines: tuple
+    deliveryTime: object
+    minDeliveryTime: object
+    maxDeliveryTime: object
+    opened: bool
+
+    @classmethod
+    def from_dict(cls, info):
+        delivery = info.get("delivery", {})
+        return cls(
+            info.get("id"),
+            info.get("name"),
+            sys.intern(info["city"]) if isinstance(info.get("city"), str) else info.get("city"),
+            tuple(info["latLong"]) if info.get("latLong") is not None else None,
+            info.get("address"),
+            info.get("bayesianScore", 0),
+            info.get("avgRating", 0),
+            info.get("totalRatings", 0),
+            _interned(info.get("cuisines")),
+            delivery.get("deliveryTime"),
+            delivery.get("minDeliveryTime"),
+            delivery.get("maxDeliveryTime"),
+            delivery.get("opened", False),
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "city": self.city,
+            "latLong": list(self.latLong) if self.latLong is not None else None,
+            "address": self.address,
+            "bayesianScore": self.bayesianScore,
+            "avgRating": self.avgRating,
+            "totalRatings": self.totalRatings,
+            "cuisines": list(self.cuisines),
+            "delivery": {
+                "deliveryTime": self.deliveryTime,
+                "minDeliveryTime": self.minDeliveryTime,
+                "maxDeliveryTime": self.maxDeliveryTime,
+                "opened": self.opened,
+            },
+        }
+
+    def to_tuple(self):
+        return (self.id, self.name, self.city, self.latLong, self.address, self.bayesianScore,
+                self.avgRating, self.totalRatings, self.cuisines, self.deliveryTime,
+                self.minDeliveryTime, self.maxDeliveryTime, self.opened)
+
+
+@dataclass(slots=True)
+class Menu:
+    info: RestaurantInfo
+    dishes: tuple
+
+    @classmethod
+    def from_dict(cls, data):
+        info = data.get("info")
+        return cls(
+            RestaurantInfo.from_dict(info) if info else None,
+            tuple(Dish.from_dict(dish_id, dish) for dish_id, dish in (data.get("dishes") or {}).items()),
+        )
+
+    # Same shape as Restaurant.get().
+    def to_dict(self):
+        return {
+            "info": self.info.to_dict() if self.info else {},
+            "dishes": {dish.id: dish.to_dict() for dish in self.dishes},
+        }
+
+    def to_tuple(self):
+        return (
+            self.info.to_tuple() if self.info else None,
+            tuple(dish.to_tuple() for dish in self.dishes),
+        )
+
+    @classmethod
+    def from_tuple(cls, state):
+        info, dishes = state
+        return cls(
+            RestaurantInfo(*info) if info else None,
+            tuple(Dish(*dish) for dish in dishes),
+        )
+
+    def __reduce__(self):
+        return (Menu.from_tuple, (self.to_tuple(),))
@@ -0,0 +1,283 @@
+import pickle
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from swiggy.dishes import DishStore
+from swiggy.fanout import fan_out
+from swiggy.index import DishIndex
+from swiggy.records import Menu, VegClass
+from swiggy.ui import SwiggyUI
+
+
+# Run with: python -m unittest swiggy.tests
+class FanOutTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown, wait=True, cancel_futures=True)
+
+    def test_yields_every_result_without_budget(self):
+        results = fan_out(lambda n: n * n, range(10), self.executor, budget=None)
+        self.assertEqual(sorted(results), [n * n for n in range(10)])
+
+    def test_results_arrive_in_completion_order(self):
+        def work(n):
+            time.sleep(0.1 if n == 0 else 0)
+            return n
+
+        results = list(fan_out(work, range(3), self.executor, budget=None))
+        self.assertEqual(results[-1], 0)
+
+    def test_budget_truncates_slow_items(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def work(n):
+            if n % 2:
+                release.wait(5)
+            return n
+
+        start = time.monotonic()
+        results = list(fan_out(work, range(4), self.executor, budget=0.2))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(sorted(results), [0, 2])
+
+    def test_queued_items_are_cancelled_after_budget(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        started = []
+
+        def work(n):
+            started.append(n)
+            release.wait(5)
+            return n
+
+        self.assertEqual(list(fan_out(work, range(12), self.executor, budget=0.1)), [])
+        release.set()
+        self.executor.shutdown(wait=True)
+        # Only the four calls already running when the budget ran out ran.
+        self.assertEqual(len(started), 4)
+
+
+class RecordsTests(unittest.TestCase):
+    def data(self, lat_long):
+        return {
+            "info": {
+                "id": "1",
+                "name": "Biryani House",
+                "city": "Hyderabad",
+                "latLong": lat_long,
+                "address": "Road 1",
+                "bayesianScore": 4.1,
+                "avgRating": 4.2,
+                "totalRatings": 1000.0,
+                "cuisines": ["Biryani", "Kebab"],
+                "delivery": {"deliveryTime": 30, "minDeliveryTime": None, "maxDeliveryTime": 35, "opened": True},
+            },
+            "dishes": {
+                "d1": {"name": "Chicken Biryani", "description": "Serves 1", "price": 250.0, "finalPrice": 200.0,
+                       "vegClassifier": "NONVEG", "rating": "4.3", "ratingCount": "120"},
+                "d2": {"name": "Raita", "description": None, "price": 40.0, "finalPrice": 40.0,
+                       "vegClassifier": "SOMETHING_NEW", "rating": 0, "ratingCount": 0},
+            },
+        }
+
+    def test_round_trip(self):
+        for lat_long in ([17.38, 78.45], None, []):
+            data = self.data(lat_long)
+            self.assertEqual(Menu.from_dict(data).to_dict(), data)
+
+    def test_pickle_round_trip(self):
+        menu = Menu.from_dict(self.data(None))
+        restored = pickle.loads(pickle.dumps(menu))
+        self.assertEqual(restored, menu)
+        self.assertIs(restored.dishes[0].vegClassifier, VegClass.NONVEG)
+
+    def test_empty_menu(self):
+        empty = {"info": {}, "dishes": {}}
+        self.assertEqual(Menu.from_dict(empty).to_dict(), empty)
+        self.assertEqual(pickle.loads(pickle.dumps(Menu.from_dict(empty))).to_dict(), empty)
+
+
+DISH_NAMES = {
+    "r1": ["Chicken Biryani", "Mutton Biryani", "Raita"],
+    "r2": ["Paneer Tikka", "Butter Naan", "Chicken Tikka Masala"],
+    "r3": ["Margherita Pizza", "Pasta Alfredo", "Garlic Bread"],
+}
+PRICES = {"Chicken Biryani": 250, "Mutton Biryani": 350, "Paneer Tikka": 220, "Margherita Pizza": 400}
+
+
+def restaurants_with_dishes(names=DISH_NAMES):
+    return [
+        {
+            "info": {"id": restaurant_id},
+            "dishes": {
+                f"{restaurant_id}-{i}": {"name": name, "price": PRICES.get(name, 100), "vegClassifier": "VEG"}
+                for i, name in enumerate(dishes)
+            },
+        }
+        for restaurant_id, dishes in names.items()
+    ]
+
+
+class DishIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.names = [name for dishes in DISH_NAMES.values() for name in dishes]
+        self.index = DishIndex(self.names)
+
+    def matches(self, query, mode):
+        return [self.names[position] for position in self.index.search(query, mode)]
+
+    def test_substring(self):
+        self.assertEqual(self.matches("biryani", "substring"), ["Chicken Biryani", "Mutton Biryani"])
+        self.assertEqual(self.matches("KEN BIR", "substring"), ["Chicken Biryani"])
+        self.assertEqual(self.matches("ta", "substring"), ["Raita", "Margherita Pizza", "Pasta Alfredo"])
+        self.assertEqual(self.matches("sushi", "substring"), [])
+
+    def test_prefix_needs_every_word_to_start_a_word(self):
+        self.assertEqual(self.matches("chi bir", "prefix"), ["Chicken Biryani"])
+        self.assertEqual(self.matches("tik", "prefix"), ["Paneer Tikka", "Chicken Tikka Masala"])
+        self.assertEqual(self.matches("iryani", "prefix"), [])
+
+    def test_fuzzy_uses_dice_threshold(self):
+        # "biryni" shares 5 of its 7 padded trigrams with biryani's 8: 10/15.
+        self.assertEqual(self.matches("biryni", "fuzzy"), ["Chicken Biryani", "Mutton Biryani"])
+        self.assertEqual(self.matches("chiken biryni", "fuzzy"), ["Chicken Biryani"])
+        self.assertEqual(self.matches("pizza", "fuzzy"), ["Margherita Pizza"])
+        # 3 shared of 6 + 6 trigrams: exactly 0.5, which still matches.
+        self.assertEqual(self.matches("pazta", "fuzzy"), ["Pasta Alfredo"])
+        self.assertEqual(self.matches("sushi", "fuzzy"), [])
+        self.assertEqual(self.index.fuzzy("biryni", threshold=0.7), set())
+
+    def test_empty_query_matches_everything(self):
+        self.assertEqual(self.matches("  ", "substring"), self.names)
+
+    def test_signature_depends_on_names_and_order(self):
+        self.assertEqual(DishIndex.signature(["a", "b"]), DishIndex.signature(["a", "b"]))
+        self.assertNotEqual(DishIndex.signature(["a", "b"]), DishIndex.signature(["b", "a"]))
+
+
+class DishStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = DishStore(restaurants_with_dishes())
+        self.index = DishIndex(self.store.frame["name"])
+
+    def matching(self, term=None, max_price=None, mode="substring", index=True):
+        return sorted(self.store.matching_restaurants(
+            term, max_price, index=self.index if index else None, mode=mode
+        ))
+
+    def test_index_agrees_with_column_scan(self):
+        for term in ["biryani", "tikka", "a", "na", "garlic bread", "sushi"]:
+            self.assertEqual(self.matching(term), self.matching(term, index=False), term)
+
+    def test_modes(self):
+        self.assertEqual(self.matching("bir", mode="prefix"), ["r1"])
+        self.assertEqual(self.matching("tika", mode="fuzzy"), ["r2"])
+
+    def test_max_price(self):
+        self.assertEqual(self.matching(max_price=150), ["r1", "r2", "r3"])
+        self.assertEqual(self.matching(max_price=99), [])
+        self.assertEqual(self.matching("biryani", max_price=300), ["r1"])
+        self.assertEqual(self.matching("pizza", max_price=300), [])
+
+    def test_short_substring_skips_the_index(self):
+        class Unused:
+            def search(self, *args):
+                raise AssertionError("index used for a short substring query")
+
+        self.assertEqual(sorted(self.store.matching_restaurants("za", index=Unused())), ["r3"])
+
+
+# The per-row SwiggyUI._process_data that the vectorised version replaced,
+# kept as the reference for what each column should contain.
+def process_per_row(restaurants, default_location):
+    processed = []
+    for r in restaurants:
+        lat_long = None
+        try:
+            if isinstance(r["info"].get("latLong"), str):
+                lat_long = list(map(float, r["info"]["latLong"].strip().split(",")))
+            elif isinstance(r["info"].get("latLong"), (list, tuple)):
+                lat_long = list(map(float, r["info"]["latLong"]))
+        except ValueError:
+            pass
+        tags = set()
+        for dish in r["dishes"].values():
+            classifier = dish.get("vegClassifier", "").upper()
+            if "VEG" in classifier:
+                tags.add("Veg")
+            if "NON_VEG" in classifier:
+                tags.add("Non-Veg")
+            if "EGG" in classifier:
+                tags.add("Egg")
+        num = r["info"].get("totalRatings", 0)
+        delivery = r["info"]["delivery"]
+        processed.append({
+            "id": r["info"].get("id"),
+            "name": r["info"].get("name"),
+            "bayesianScore": r["info"].get("bayesianScore", 0),
+            "avgRating": r["info"].get("avgRating", 0),
+            "totalRatings": f"{num/1000:.1f}K".replace(".0K", "K") if num >= 1000 else str(int(num)),
+            "tags": tags,
+            "dishes": list(r["dishes"].values()),
+            "latitude": lat_long[0] if lat_long else default_location[0],
+            "longitude": lat_long[1] if lat_long and len(lat_long) > 1 else default_location[1],
+            "delivery.deliveryTime": delivery.get("deliveryTime", 40),
+            "delivery.minDeliveryTime": delivery.get("minDeliveryTime", 35),
+            "delivery.maxDeliveryTime": delivery.get("maxDeliveryTime", 45),
+            "delivery.opened": delivery.get("opened", False),
+            "address": r["info"].get("address", "Address not available"),
+        })
+    return pd.DataFrame(processed)
+
+
+def restaurant(restaurant_id, lat_long, delivery=None, **info):
+    return {
+        "info": {"id": restaurant_id, "latLong": lat_long, "delivery": delivery or {}, **info},
+        "dishes": {
+            f"{restaurant_id}-0": {"name": "Dal", "price": 90, "vegClassifier": "VEG"},
+            f"{restaurant_id}-1": {"name": "Omelette", "price": 60, "vegClassifier": "EGG"},
+        },
+    }
+
+
+class ProcessDataTests(unittest.TestCase):
+    def process(self, restaurants):
+        return SwiggyUI(restaurants, default_location=[25.3176, 82.9739]).restaurants
+
+    def assertNearDefault(self, values):
+        self.assertTrue(np.all(np.abs(np.asarray(values) - 25.3176) <= 0.05), values)
+
+    def test_unusable_lat_longs_fall_back_to_default_location(self):
+        for lat_longs in ([None], [None, None], [[]], [[], []], ["17.1"], [None, [], "17.1,78.2", "bad"]):
+            df = self.process([restaurant(f"r{i}", v) for i, v in enumerate(lat_longs)])
+            self.assertEqual(len(df), len(lat_longs))
+            self.assertFalse(df[["latitude", "longitude"]].isna().any().any(), lat_longs)
+            for row, lat_long in zip(df.itertuples(), lat_longs):
+                if lat_long and lat_long != "bad":
+                    self.assertEqual(row.latitude, 17.1)
+                else:
+                    self.assertNearDefault(row.latitude)
+        df = self.process([restaurant("r1", "17.1,78.2"), restaurant("r2", [12.9, 77.6])])
+        self.assertEqual(df[["latitude", "longitude"]].values.tolist(), [[17.1, 78.2], [12.9, 77.6]])
+
+    def test_matches_per_row_processing(self):
+        restaurants = [
+            restaurant("r1", "17.1, 78.2", {"deliveryTime": 30, "minDeliveryTime": 25, "maxDeliveryTime": 35,
+                                            "opened": True},
+                       name="One", avgRating=4.2, bayesianScore=4.0, totalRatings=1500, address="Road 1"),
+            restaurant("r2", [12.9, 77.6], {"deliveryTime": None, "minDeliveryTime": None}, name="Two",
+                       totalRatings=999),
+            restaurant("r3", "1,2,3", {}, name=None, avgRating=None, totalRatings=2000),
+        ]
+        for rows in (restaurants, restaurants[1:2], restaurants[2:]):
+            expected = process_per_row(rows, [25.3176, 82.9739])
+            actual = self.process(rows)
+            expected["tags"] = expected["tags"].map(set)
+            actual["tags"] = actual["tags"].map(set)
+            pd.testing.assert_frame_equal(actual, expected)
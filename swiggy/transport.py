@@ -0,0 +1,103 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from swiggy.limiter import HostLimiter
+from swiggy.replay import RecordingTransport, ReplayTransport
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+# Upper bound on simultaneous keep-alive connections per upstream host.
+HOST_LIMITS = {
+    "www.swiggy.com": 32,
+    "ipinfo.io": 2,
+}
+
+# Hosts whose requests go through a HostLimiter (rate, adaptive concurrency,
+# retries, circuit breaker). Its concurrency ceiling is the host's pool size.
+LIMITED_HOSTS = ("www.swiggy.com",)
+
+
+# One pool per host: a burst of menu fetches reuses a fixed set of keep-alive
+# connections, and with block=True callers wait for a free one once it is full.
+class Transport:
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, host_limits=None, block=True,
+                 limited_hosts=LIMITED_HOSTS, upstream=None):
+        self.block = block
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.limiters = {
+            host: HostLimiter(host, max_concurrency=self.host_limits.get(host, pool_maxsize))
+            for host in limited_hosts
+        }
+        self.session = requests.Session()
+        # Requests stay stateless like a bare requests.get: never persist Set-Cookie.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        default = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=block)
+        self.session.mount("https://", default)
+        self.session.mount("http://", default)
+        for host, limit in self.host_limits.items():
+            self.mount(host, limit)
+
+        # A stand-in upstream (e.g. benchmarks.upstream) receives the requests
+        # for every host; pools and limiters still follow the original host.
+        self.upstream = upstream.rstrip("/") if upstream else None
+        if self.upstream:
+            self.mount(urlsplit(self.upstream).netloc, max(self.host_limits.values(), default=pool_maxsize))
+
+    def mount(self, host, limit):
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit, pool_block=self.block)
+        for scheme in ("https://", "http://"):
+            self.session.mount(f"{scheme}{host}/", adapter)
+        self.host_limits[host] = limit
+
+    def get(self, url, **kwargs):
+        parts = urlsplit(url)
+        if self.upstream:
+            url = self.upstream + parts.path + (f"?{parts.query}" if parts.query else "")
+        limiter = self.limiters.get(parts.hostname)
+        if limiter is None:
+            return self.session.get(url, **kwargs)
+        return limiter.call(lambda: self.session.get(url, **kwargs))
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = transport_from_env()
+    return _transport
+
+
+# SWIGGY_RECORD=<path> records every upstream response to an archive while
+# scraping live; SWIGGY_REPLAY=<path> serves them back with no network access,
+# after SWIGGY_REPLAY_LATENCY seconds each (or "recorded"). SWIGGY_UPSTREAM=<url>
+# sends all upstream requests to a stand-in server instead.
+def transport_from_env():
+    replay = os.environ.get("SWIGGY_REPLAY")
+    if replay:
+        latency = os.environ.get("SWIGGY_REPLAY_LATENCY", "0")
+        return ReplayTransport(replay, latency if latency == "recorded" else float(latency))
+    transport = Transport(upstream=os.environ.get("SWIGGY_UPSTREAM"))
+    record = os.environ.get("SWIGGY_RECORD")
+    return RecordingTransport(transport, record) if record else transport
+
+
+def set_transport(transport):
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    return previous
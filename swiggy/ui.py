@@ -1,98 +1,229 @@
+import hashlib
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from swiggy.dishes import DishStore
+from swiggy.index import DishIndex
+
+
+# Built once per result set and shared by every rerun that shows it.
+@st.cache_resource(max_entries=16)
+def build_dish_index(signature, _names):
+    return DishIndex(_names)
+
+
+CHART_CACHE_SIZE = 256
+
+
+def chart_signature(*columns):
+    digest = hashlib.sha1()
+    for values in zip(*columns):
+        digest.update("\x00".join(map(str, values)).encode() + b"\x01")
+    return digest.hexdigest()
+
+
+# Plotly specs (plain dicts) keyed by restaurant id and a hash of what they
+# plot; a rerun that only re-sorts or re-pages reuses them instead of
+# rebuilding figures. st.cache_data evicts least recently used entries.
+@st.cache_data(max_entries=CHART_CACHE_SIZE)
+def price_chart_spec(restaurant_id, signature, _names, _prices):
+    df = pd.DataFrame({"Dish": _names, "Price (₹)": _prices})
+    fig = px.bar(
+        df,
+        x="Dish",
+        y="Price (₹)",
+        title="Top Dish Prices",
+        color="Price (₹)",
+        color_continuous_scale="tealrose",
+    )
+
+    fig.update_layout(
+        xaxis_title=None,
+        yaxis_title="Price (₹)",
+        showlegend=False,
+        height=350,
+        margin=dict(l=20, r=20, t=40, b=100),
+        xaxis_tickangle=-45,
+        xaxis={"categoryorder": "total descending"},
+        plot_bgcolor="rgba(0,0,0,0)",
+    )
+    fig.update_traces(marker_line_width=0)
+    return fig.to_dict()
+
+
+@st.cache_data(max_entries=16)
+def heatmap_spec(signature, _points, center):
+    fig = px.density_mapbox(
+        _points,
+        lat="latitude",
+        lon="longitude",
+        z=None,
+        radius=10,
+        center={"lat": center[0], "lon": center[1]},
+        zoom=10,
+        mapbox_style="open-street-map",
+        title="City/Area Distribution",
+    )
+    return fig.to_dict()
+
+
+# Same fallbacks as the old per-row dict.get() calls.
+DEFAULTS = {
+    "id": None,
+    "name": None,
+    "latLong": None,
+    "bayesianScore": 0,
+    "avgRating": 0,
+    "totalRatings": 0,
+    "address": "Address not available",
+    "delivery.deliveryTime": 40,
+    "delivery.minDeliveryTime": 35,
+    "delivery.maxDeliveryTime": 45,
+    "delivery.opened": False,
+}
+
+PAGE_SIZES = [10, 25, 50]
 
 
 class SwiggyUI:
     def __init__(self, restaurants=None, default_location=None):
         self.default_location = default_location or [25.3176, 82.9739]
+        self.dishes = DishStore(restaurants) if restaurants else None
+        self.tags = self.dishes.tags() if self.dishes is not None else {}
+        self.index = self._dish_index() if self.dishes is not None else None
         self.restaurants = self._process_data(restaurants) if restaurants else None
         self.filtered_df = None
+        # False when stream_results ran out of budget before every menu loaded.
+        self.complete = True
 
     def _process_data(self, restaurants):
-        processed = []
-        for r in restaurants:
-            try:
-
-                lat_long = None
-                if "latLong" in r["info"]:
-                    try:
-                        if isinstance(r["info"]["latLong"], str):
-                            lat_long = list(
-                                map(float, r["info"]["latLong"].strip().split(","))
-                            )
-                        elif isinstance(r["info"]["latLong"], (list, tuple)):
-                            lat_long = list(map(float, r["info"]["latLong"]))
-                    except (ValueError, AttributeError):
-                        pass
-
-                address = r["info"].get("address", "Address not available")
-
-                latitude = (
-                    lat_long[0]
-                    if lat_long and len(lat_long) > 0
-                    else np.random.uniform(
-                        self.default_location[0] - 0.05, self.default_location[0] + 0.05
-                    )
-                )
-                longitude = (
-                    lat_long[1]
-                    if lat_long and len(lat_long) > 1
-                    else np.random.uniform(
-                        self.default_location[1] - 0.05, self.default_location[1] + 0.05
+        valid = [
+            r
+            for r in restaurants
+            if "dishes" in r and "info" in r and "delivery" in r["info"]
+        ]
+        if len(valid) < len(restaurants):
+            st.warning(
+                f"Skipping {len(restaurants) - len(valid)} restaurant(s) due to missing data"
+            )
+        if not valid:
+            return pd.DataFrame()
+
+        # One list per column with dict.get(), as the old per-row code did:
+        # only an absent key falls back to the default, an explicit None
+        # stays missing, and pandas infers the same dtypes.
+        infos = [r["info"] for r in valid]
+        deliveries = [i["delivery"] for i in infos]
+        info = {}
+        for column, default in DEFAULTS.items():
+            if column.startswith("delivery."):
+                records, key = deliveries, column[len("delivery."):]
+            else:
+                records, key = infos, column
+            info[column] = pd.Series([record.get(key, default) for record in records])
+
+        latitude, longitude = self._coordinates(info["latLong"])
+        ids = info["id"]
+        return pd.DataFrame(
+            {
+                "id": ids,
+                "name": info["name"],
+                "bayesianScore": info["bayesianScore"],
+                "avgRating": info["avgRating"],
+                "totalRatings": self._format_reviews_batch(info["totalRatings"]),
+                "tags": [self.tags.get(restaurant_id, []) for restaurant_id in ids],
+                "dishes": [list(r["dishes"].values()) for r in valid],
+                "latitude": latitude,
+                "longitude": longitude,
+                "delivery.deliveryTime": info["delivery.deliveryTime"],
+                "delivery.minDeliveryTime": info["delivery.minDeliveryTime"],
+                "delivery.maxDeliveryTime": info["delivery.maxDeliveryTime"],
+                "delivery.opened": info["delivery.opened"].astype(bool),
+                "address": info["address"],
+            }
+        )
+
+    def _coordinates(self, lat_longs):
+        # "lat,lng" strings and [lat, lng] sequences are parsed in one pass;
+        # anything unparseable is scattered around the default location.
+        text = lat_longs.map(
+            lambda v: ",".join(map(str, v)) if isinstance(v, (list, tuple)) else v
+        )
+        parts = text.astype("string").str.strip().str.split(",", expand=True)
+        parts = parts.reindex(columns=[0, 1])
+        # Copies: under copy-on-write an all-NA column converts to a
+        # read-only view, and the missing values are filled in place below.
+        latitude = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=float, copy=True)
+        longitude = pd.to_numeric(parts[1], errors="coerce").to_numpy(dtype=float, copy=True)
+        for values, centre in (
+            (latitude, self.default_location[0]),
+            (longitude, self.default_location[1]),
+        ):
+            missing = np.isnan(values)
+            values[missing] = np.random.uniform(
+                centre - 0.05, centre + 0.05, missing.sum()
+            )
+        return latitude, longitude
+
+    def _dish_index(self):
+        names = self.dishes.frame["name"]
+        return build_dish_index(DishIndex.signature(names), names)
+
+    def stream_results(self, menus, total):
+        progress = st.progress(0.0, text=f"Loaded 0 of {total} menus")
+        live = st.empty()
+        results = []
+        rows = []
+        done = 0
+        for res in menus:
+            done += 1
+            if res:
+                results.append(res)
+                if res.get("info"):
+                    rows.append(
+                        {
+                            "Restaurant": res["info"].get("name"),
+                            "Rating": res["info"].get("avgRating", 0),
+                            "Delivery (mins)": res["info"]
+                            .get("delivery", {})
+                            .get("deliveryTime"),
+                        }
                     )
-                )
+                    live.dataframe(pd.DataFrame(rows), hide_index=True, width="stretch")
+            progress.progress(done / total, text=f"Loaded {done} of {total} menus")
+
+        progress.empty()
+        live.empty()
+        self.complete = done >= total
+        if not self.complete:
+            st.info(
+                f"Showing {done} of {total} restaurants; the rest took too long to load."
+            )
+        return results
+
+    def _page(self, df):
+        # Only the visible page gets expanders, maps and price charts.
+        col1, col2, col3 = st.columns([1, 1, 2])
+        page_size = col1.selectbox("Per page", options=PAGE_SIZES)
+        pages = max(1, -(-len(df) // page_size))
+        page = col2.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+        start = (page - 1) * page_size
+        end = min(start + page_size, len(df))
+        col3.caption(
+            f"Showing {start + 1 if end else 0}-{end} of {len(df)} restaurants"
+        )
+        return df.iloc[start:end]
 
-                processed.append(
-                    {
-                        "id": r["info"].get("id"),
-                        "name": r["info"].get("name"),
-                        "bayesianScore": r["info"].get("bayesianScore", 0),
-                        "avgRating": r["info"].get("avgRating", 0),
-                        "totalRatings": self._format_reviews(
-                            r["info"].get("totalRatings", 0)
-                        ),
-                        "tags": self._extract_tags(r),
-                        "dishes": list(r["dishes"].values()),
-                        "latitude": latitude,
-                        "longitude": longitude,
-                        "delivery.deliveryTime": r["info"]["delivery"].get(
-                            "deliveryTime", 40
-                        ),
-                        "delivery.minDeliveryTime": r["info"]["delivery"].get(
-                            "minDeliveryTime", 35
-                        ),
-                        "delivery.maxDeliveryTime": r["info"]["delivery"].get(
-                            "maxDeliveryTime", 45
-                        ),
-                        "delivery.opened": r["info"]["delivery"].get("opened", False),
-                        "address": address,
-                    }
-                )
-            except KeyError as e:
-                st.warning(f"Skipping restaurant due to missing data: {str(e)}")
-                continue
-        return pd.DataFrame(processed)
-
-    def _format_reviews(self, num):
-        if num >= 1000:
-            return f"{num/1000:.1f}K".replace(".0K", "K")
-        return str(int(num))
-
-    def _extract_tags(self, restaurant):
-        tags = set()
-        for dish in restaurant["dishes"].values():
-            classifier = dish.get("vegClassifier", "").upper()
-            if "VEG" in classifier:
-                tags.add("Veg")
-            if "NON_VEG" in classifier:
-                tags.add("Non-Veg")
-            if "EGG" in classifier:
-                tags.add("Egg")
-        return list(tags)
-
-    def _create_price_chart(self, dishes):
+    def _format_reviews_batch(self, nums):
+        nums = pd.to_numeric(nums, errors="coerce").fillna(0)
+        thousands = (nums / 1000).map("{:.1f}K".format).str.replace(
+            ".0K", "K", regex=False
+        )
+        return np.where(nums >= 1000, thousands, nums.astype(int).astype(str))
+
+    def _create_price_chart(self, dishes, restaurant_id=None):
         if not dishes:
             return None
 
@@ -112,28 +243,9 @@ class SwiggyUI:
         if not prices:
             return None
 
-        df = pd.DataFrame({"Dish": names, "Price (₹)": prices})
-        fig = px.bar(
-            df,
-            x="Dish",
-            y="Price (₹)",
-            title="Top Dish Prices",
-            color="Price (₹)",
-            color_continuous_scale="tealrose",
-        )
-
-        fig.update_layout(
-            xaxis_title=None,
-            yaxis_title="Price (₹)",
-            showlegend=False,
-            height=350,
-            margin=dict(l=20, r=20, t=40, b=100),
-            xaxis_tickangle=-45,
-            xaxis={"categoryorder": "total descending"},
-            plot_bgcolor="rgba(0,0,0,0)",
+        return price_chart_spec(
+            restaurant_id, chart_signature(names, prices), names, prices
         )
-        fig.update_traces(marker_line_width=0)
-        return fig
 
     def render_results(self):
         if self.restaurants is None or self.restaurants.empty:
@@ -142,6 +254,18 @@ class SwiggyUI:
 
         st.sidebar.header("Filters")
         dish_search = st.sidebar.text_input("Search Dishes")
+        match_mode = st.sidebar.radio(
+            "Match", options=["Substring", "Prefix", "Fuzzy"], horizontal=True
+        )
+
+        max_price = None
+        price_ceiling = int(np.ceil(self.dishes.max_price()))
+        if price_ceiling > 0:
+            price_limit = st.sidebar.slider(
+                "Max Dish Price (₹)", 0, price_ceiling, price_ceiling
+            )
+            if price_limit < price_ceiling:
+                max_price = price_limit
 
         sort_option = st.sidebar.selectbox(
             "Sort By",
@@ -154,14 +278,11 @@ class SwiggyUI:
         )
 
         self.filtered_df = self.restaurants.copy()
-        if dish_search:
-            self.filtered_df = self.filtered_df[
-                self.filtered_df["dishes"].apply(
-                    lambda x: any(
-                        dish_search.lower() in dish["name"].lower() for dish in x
-                    )
-                )
-            ]
+        if dish_search or max_price is not None:
+            matches = self.dishes.matching_restaurants(
+                dish_search, max_price, index=self.index, mode=match_mode.lower()
+            )
+            self.filtered_df = self.filtered_df[self.filtered_df["id"].isin(matches)]
 
         if sort_option == "Consistent Delivery (Most First)":
             self.filtered_df["delivery_range"] = (
@@ -202,20 +323,15 @@ class SwiggyUI:
             color_discrete_sequence=px.colors.sequential.Teal,
         )
 
-        if not self.filtered_df.empty:
-            heatmap_fig = px.density_mapbox(
-                self.filtered_df,
-                lat="latitude",
-                lon="longitude",
-                z=None,
-                radius=10,
-                center={
-                    "lat": self.default_location[0],
-                    "lon": self.default_location[1],
-                },
-                zoom=10,
-                mapbox_style="open-street-map",
-                title="City/Area Distribution",
+        # Maps only need coordinates, not the dish lists riding along in each row.
+        points = self.filtered_df[["latitude", "longitude"]]
+        if not points.empty:
+            heatmap_fig = heatmap_spec(
+                chart_signature(
+                    self.filtered_df["id"], points["latitude"], points["longitude"]
+                ),
+                points,
+                tuple(self.default_location),
             )
         else:
             heatmap_fig = None
@@ -240,7 +356,19 @@ class SwiggyUI:
         st.divider()
         st.header("Restaurant List")
 
-        for _, row in self.filtered_df.iterrows():
+        # Injected once for the whole list rather than once per restaurant.
+        st.markdown(
+            """
+        <style>
+        .square-map iframe {
+            height: 300px !important;
+        }
+        </style>
+        """,
+            unsafe_allow_html=True,
+        )
+
+        for _, row in self._page(self.filtered_df).iterrows():
             with st.expander(
                 f"{row['name']} - ⭐ {row['avgRating']} ({row['totalRatings']} reviews)",
                 expanded=False,
@@ -251,17 +379,6 @@ class SwiggyUI:
                 with col1:
                     st.write(f"📌 **Address:** {row['address']}")
 
-                    st.markdown(
-                        """
-                    <style>
-                    .square-map iframe {
-                        height: 300px !important;
-                    }
-                    </style>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
                     st.markdown('<div class="square-map">', unsafe_allow_html=True)
                     st.map(
                         pd.DataFrame(
@@ -295,12 +412,14 @@ class SwiggyUI:
                         f"**🔄 Status:** {'🟢 Open Now' if row['delivery.opened'] else '🔴 Closed'}"
                     )
 
-                    fig = self._create_price_chart(row["dishes"])
+                    fig = self._create_price_chart(row["dishes"], row["id"])
                     if fig:
                         st.plotly_chart(
                             fig,
                             use_container_width=True,
                             config={"displayModeBar": False},
+                            # Outlets of a chain can share an identical menu.
+                            key=f"prices-{row['id']}",
                         )
                     else:
                         st.info("Price data not available")
@@ -331,7 +450,7 @@ class SwiggyUI:
             )
 
             st.map(
-                self.filtered_df,
+                points,
                 latitude="latitude",
                 longitude="longitude",
                 size=30,